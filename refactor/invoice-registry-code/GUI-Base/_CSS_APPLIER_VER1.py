@@ -10,8 +10,16 @@ class CssManager:
         The general_theme is expected to be a dictionary mapping widget types
         (like "QPushButton", "QLabel", etc.) to another dictionary mapping
         pseudo selectors (or empty string for base) to a CSS snippet.
+
+        Nothing is compiled here, each widget type's stylesheet is built on first use and memoized
+        (see get_widget_css), so creating a manager for a theme that is never shown costs nothing.
         """
         self.general_theme = general_theme
+        self._css_cache = {}  # (widget_type, frozen modifier) -> compiled CSS string
+
+    def clear_cache(self):
+        """Forget the compiled stylesheets, call after changing self.general_theme in place."""
+        self._css_cache.clear()
 
     @staticmethod
     def parse_css(css_str: str) -> dict:
@@ -67,7 +75,15 @@ class CssManager:
             }
         If widget_modifier is provided, its properties will be merged with the
         corresponding general theme rules.
+        The result is memoized per widget type and modifier, re-applying a theme does not rebuild it.
         """
+        key = (widget_type, tuple(sorted(widget_modifier.items())) if widget_modifier else None)
+        css = self._css_cache.get(key)
+        if css is None:
+            css = self._css_cache[key] = self._build_widget_css(widget_type, widget_modifier)
+        return css
+
+    def _build_widget_css(self, widget_type: str, widget_modifier: dict = None) -> str:
         # Start with the general theme for this widget type (or an empty dict if not provided)
         general_css_dict = self.general_theme.get(widget_type, {})
         # Prepare a merged dictionary (pseudo selector → css snippet)
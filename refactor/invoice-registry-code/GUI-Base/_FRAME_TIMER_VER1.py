@@ -0,0 +1,83 @@
+import time
+
+from PyQt5.QtCore import QObject, QTimer, QCoreApplication, QEvent
+
+
+class EventLoopStallMonitor(QObject):
+    """
+    Measures how long the Qt event loop is blocked.
+
+    A QTimer ticks every interval_ms; whenever the gap between two ticks exceeds the interval by more
+    than stall_ms, the extra time is recorded as a stall. Work that runs synchronously inside a
+    callback (building a ribbon, filling a table, re-styling every widget) shows up as one stall once
+    control returns to the event loop.
+    """
+
+    def __init__(self, interval_ms=5, stall_ms=16, parent=None):
+        super().__init__(parent)
+        self.interval_ms = interval_ms
+        self.stall_ms = stall_ms
+        self.stalls = []  # stall durations in ms
+        self._last_tick = None
+        self._timer = QTimer(self)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self._tick)
+
+    def start(self):
+        self._last_tick = time.perf_counter()
+        self._timer.start()
+
+    def stop(self):
+        self._timer.stop()
+        self._last_tick = None
+
+    def reset(self):
+        self.stalls = []
+        if self._last_tick is not None:
+            self._last_tick = time.perf_counter()
+
+    def _tick(self):
+        now = time.perf_counter()
+        if self._last_tick is not None:
+            late_ms = (now - self._last_tick) * 1000 - self.interval_ms
+            if late_ms > self.stall_ms:
+                self.stalls.append(late_ms)
+        self._last_tick = now
+
+    def summary(self):
+        """Returns {"stalls", "max_stall_ms", "total_stall_ms"} of the stalls seen since the last reset"""
+        return {
+            "stalls": len(self.stalls),
+            "max_stall_ms": round(max(self.stalls), 3) if self.stalls else 0.0,
+            "total_stall_ms": round(sum(self.stalls), 3),
+        }
+
+
+class FrameTimer:
+    """
+    Context manager timing a block of UI work up to the point its results are on screen.
+
+    On exit it flushes posted events (including deleteLater) and lets the event loop run once, so the
+    measured time covers layout / paint work Qt defers after the block itself returns.
+
+        with FrameTimer("populate") as frame:
+            window.update_table_data(table, rows)
+        print(frame.name, frame.elapsed_ms)
+    """
+
+    def __init__(self, name=""):
+        self.name = name
+        self.elapsed_ms = None
+        self._start = None
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        app = QCoreApplication.instance()
+        if app is not None:
+            QCoreApplication.sendPostedEvents(None, QEvent.DeferredDelete)
+            app.processEvents()
+        self.elapsed_ms = (time.perf_counter() - self._start) * 1000
+        return False
@@ -5,7 +5,30 @@ from PyQt5.QtWidgets import (
     QPushButton, QTableWidget, QTableWidgetItem, QComboBox, QLabel,
     QFileDialog, QInputDialog, QLineEdit, QAbstractButton, QSizePolicy, QMessageBox
 )
-from themes import THEMES
+from _RIBBON_COMPILER_VER1 import RibbonCompiler, LAYOUT
+from _WIDGET_REGISTRY_VER1 import WidgetRegistry
+
+
+_THEMES = None
+
+
+def load_themes():
+    """
+    Returns the THEMES dict of the themes module, importing it on first use so the theme definitions
+    are only loaded once a theme is actually needed, not while the application starts.
+    """
+    global _THEMES
+    if _THEMES is None:
+        from themes import THEMES
+        _THEMES = THEMES
+    return _THEMES
+
+
+# Layout classes for the layout types produced by RibbonCompiler.
+LAYOUT_CLASSES = {
+    "qhboxlayout": QHBoxLayout,
+    "qvboxlayout": QVBoxLayout,
+}
 
 
 class WidgetsUpdater:
@@ -195,7 +218,6 @@ class WidgetsTypes(WidgetsUpdater):
         Returns:
             QTableWidget: The created table widget.
         """
-        print(rows, columns, data, headers)
         tbl = QTableWidget(rows, columns)
 
         if headers:
@@ -249,10 +271,31 @@ class MainWindow(QMainWindow, WidgetsTypes):
         self.input_values = []  # Stores all input box values
         self.input_boxes = []  # Stores all the input boxes instances.
         self.widgets_container = {}
+        self.widget_registry = WidgetRegistry()  # O(1) lookups by key path, type and tag.
+        # Per window: cached plans hold the config's callbacks (bound to this window), a shared cache
+        # would keep closed windows alive. Table data is never cached, see PAYLOAD_OPTIONS.
+        self.ribbon_compiler = RibbonCompiler()
+        self.widget_creators = {
+            "button": self.button,
+            "label": self.label,
+            "combo_box": self.combo_box,
+            "input_box": self.input_box,
+            "table": self.table,
+        }
         self.init_ui(pos_x, pos_y, width, height, screen_name)
         self.current_theme = "dark"  # Default theme (switch will cause some problems.. look into journels for details)
-        self.current_theme_dict = THEMES[self.current_theme]
+        self._current_theme_dict = None  # Filled from THEMES on first access, see current_theme_dict
+
+    @property
+    def current_theme_dict(self):
+        """Theme dictionary of self.current_theme, the themes module is loaded on first access"""
+        if self._current_theme_dict is None:
+            self._current_theme_dict = load_themes()[self.current_theme]
+        return self._current_theme_dict
 
+    @current_theme_dict.setter
+    def current_theme_dict(self, theme_dict):
+        self._current_theme_dict = theme_dict
 
     def init_ui(self, pos_x, pos_y, width, height, screen_name):
         """
@@ -273,44 +316,62 @@ class MainWindow(QMainWindow, WidgetsTypes):
         self.setCentralWidget(central_widget)
         self.main_layout = QVBoxLayout(central_widget)
         self.widgets_container["qvboxlayout_central_widget"] = self.main_layout
+        self.widget_registry.register(("qvboxlayout_central_widget",), self.main_layout)
 
-    def add_flexible_ribbon(self, ribbon_config, parent_layout, container_dict):
+    def add_flexible_ribbon(self, ribbon_config, parent_layout, container_dict, namespace=None):
         """
-            Recursively parses a nested dictionary to construct a flexible ribbon, handling containers,
+            Builds a flexible ribbon from a nested configuration dictionary, handling containers,
             widgets, and ComboBox creation. Returns a dictionary of widget instances (and container layouts)
             for further modification.
 
+            The config is validated and flattened once by self.ribbon_compiler (see _RIBBON_COMPILER_VER1),
+            the resulting plan is cached by structure, so showing the same screen again (even with new table
+            "data") only instantiates the widgets.
+            Every created instance is also registered in self.widget_registry under its fully qualified key
+            path (namespace + key path inside the config), together with the optional "tags" list of its config
+            (e.g. "tags": ["write"]) for bulk operations.
+
             the return is self.widget_container
 
+            Raises:
+                RibbonConfigError: If the config has unknown layouts, widget types or keys, or invalid values.
+                ValueError: If no namespace is given and parent_layout is not registered in self.widget_registry.
+
             Parameters:
                 ribbon_config (dict): Configuration dictionary defining the UI structure. Keys that
                     represent container layouts must start with one of the following prefixes (case insensitive):
                         - "qhboxlayout_"  → QHBoxLayout
                         - "qvboxlayout_"  → QVBoxLayout
-                        - "scrollh_"     → Horizontal scroll container (internally a QHBoxLayout, can be embedded in a QScrollArea)
-                        - "scrollv_"     → Vertical scroll container (internally a QVBoxLayout, can be embedded in a QScrollArea)
                     For widget definitions, the dictionary should include the key "widget_type" with one of the following values:
-                        - "button": Requires keys such as "text", "callback", "style", and "hover_style" (optional)
-                        - "label":  Requires key "text" and optionally "style"
-                        - "combo_box": Requires keys "items", "callback", "label_text", and optionally "style" and "hover_style"
-                parent_layout (QLayout, optional): The layout to which the generated UI elements will be added.
-                    Defaults to self.main_layout.
+                        - "button": Optional keys "text" and "callback" (a callable)
+                        - "label":  Optional key "text"
+                        - "combo_box": Optional keys "items" (a list), "callback" (a callable) and "label_text"
+                        - "input_box": Optional key "text" (the placeholder)
+                        - "table": Optional keys "rows", "columns", "data" (a list of rows) and "header" (a list)
+                    Every widget also accepts "style", "hover_style" and "tags" (a list of strings).
+                parent_layout (QLayout): The layout to which the generated UI elements will be added,
+                    e.g. self.main_layout.
+                container_dict (dict): Nested dictionary the created instances are stored in, by config key.
+                namespace (tuple, optional): Key path the ribbon is registered under. Defaults to the registered
+                    path of parent_layout, e.g. ("qvboxlayout_central_widget",) for self.main_layout, so two
+                    ribbons built into different layouts never share registry paths.
 
             Returns:
-                dict: A dictionary mapping each key in the configuration to its created widget instance or
-                      container layout. This allows for further dynamic modifications after creation.
+                dict: self.widgets_container, mapping each key in the configuration to its created widget
+                      instance or container layout. This allows for further dynamic modifications after creation.
 
             Supported Container Types:
                 - qhboxlayout_: Creates a QHBoxLayout.
                 - qvboxlayout_: Creates a QVBoxLayout.
-                - scrollh_: Creates a horizontally scrollable container.
-                - scrollv_: Creates a vertically scrollable container.
+                Any other key without a "widget_type" (e.g. the former "scrollh_"/"scrollv_") raises RibbonConfigError.
 
             Supported Widget Types:
-                - button: Creates a QPushButton (via _add_button_to_layout). Must specify a "callback" (as a function or a string name)
-                          and a "text" property.
-                - label:  Creates a QLabel. Must specify a "text" property.
-                - combo_box: Creates a QComboBox with an optional label. Must specify "items" (a list) and "callback".
+                - button: Creates a QPushButton with "text", "callback" must be a callable (a string name
+                          raises RibbonConfigError).
+                - label:  Creates a QLabel with "text".
+                - combo_box: Creates a QComboBox filled with "items", "callback" must be a callable.
+                - input_box: Creates a QLineEdit with "text" as the placeholder.
+                - table: Creates a QTableWidget of "rows" x "columns" filled with "data" and "header".
 
             Examples:
 
@@ -318,82 +379,77 @@ class MainWindow(QMainWindow, WidgetsTypes):
                 ribbon_config = {
                     "qhboxlayout_main": {
                         "title_label": {"widget_type": "label", "text": "Main Controls"},
-                        "start_button": {"widget_type": "button", "text": "Start", "callback": "start_function"},
-                        "stop_button": {"widget_type": "button", "text": "Stop", "callback": "stop_function"}
+                        "start_button": {"widget_type": "button", "text": "Start", "callback": self.start_function},
+                        "stop_button": {"widget_type": "button", "text": "Stop", "callback": self.stop_function}
                     },
                     "qvboxlayout_settings": {
                         "combo_box_example": {
                             "widget_type": "combo_box",
                             "items": ["Option 1", "Option 2", "Option 3"],
-                            "callback": "selection_changed",
+                            "callback": self.selection_changed,
                             "label_text": "Select an Option:"
                         }
                     }
                 }
-                widget_instances = self.add_flexible_ribbon(ribbon_config)
+                widget_instances = self.add_flexible_ribbon(ribbon_config, self.main_layout, {})
+                start_button = self.find_widget(self.widgets_container,
+                                                ["qvboxlayout_central_widget", "qhboxlayout_main", "start_button"])
 
             Example 2 - Nested Layouts and Mixed Widgets:
                 ribbon_config = {
                     "qhboxlayout_top": {
                         "header_label": {"widget_type": "label", "text": "User Panel"},
                         "qhboxlayout_buttons": {
-                            "login_button": {"widget_type": "button", "text": "Login", "callback": "login_user"},
-                            "logout_button": {"widget_type": "button", "text": "Logout", "callback": "logout_user"}
+                            "login_button": {"widget_type": "button", "text": "Login", "callback": self.login_user},
+                            "logout_button": {"widget_type": "button", "text": "Logout", "callback": self.logout_user,
+                                              "tags": ["session"]}
                         }
                     },
                     "qvboxlayout_preferences": {
                         "theme_selector": {
                             "widget_type": "combo_box",
                             "items": ["Light", "Dark"],
-                            "callback": "change_theme",
+                            "callback": self.change_theme,
                             "label_text": "Theme:"
                         }
                     }
                 }
-                widget_instances = self.add_flexible_ribbon(ribbon_config)
+                widget_instances = self.add_flexible_ribbon(ribbon_config, self.main_layout, {})
+                self.set_widgets_enabled("session", False)
             """
-        for key, value in ribbon_config.items():
-            if isinstance(value, dict) and "widget_type" not in value:
-                key_lowered = key.lower()
-                if key_lowered.startswith("qvboxlayout_"):
-                    new_layout = QVBoxLayout()
-                    parent_layout.addLayout(new_layout)
-                elif key_lowered.startswith("qhboxlayout_"):
-                    new_layout = QHBoxLayout()
-                    parent_layout.addLayout(new_layout)
-                else:
-                    print(f"UNKNOWN TYPE OF LAYOUT: {key} in {ribbon_config} SKIPPING...")
-                    continue
-
-                self.widgets_container[key] = new_layout
+        # Payloads (table rows) are bound up front, so an invalid one raises before any widget is created.
+        steps = list(self.ribbon_compiler.compile(ribbon_config).bind(ribbon_config))
+        if namespace is None:
+            namespace = self.widget_registry.path_of(parent_layout)
+            if namespace is None:
+                raise ValueError("parent_layout is not registered in self.widget_registry, pass a namespace")
+        namespace = WidgetRegistry.normalize_path(namespace)
+
+        # Parent key path -> (layout, nested container dict) of every layout created so far.
+        parents = {(): (parent_layout, container_dict)}
+        for step, args in steps:
+            layout, container = parents[step.parent]
+            if step.kind == LAYOUT:
+                instance = LAYOUT_CLASSES[step.widget_type]()
+                layout.addLayout(instance)
                 # Initialize the nested dictionary for this container.
-                container_dict[key] = {}
-                # Recursively process the children.
-                self.add_flexible_ribbon(value, new_layout, container_dict[key])
+                container[step.key] = {}
+                parents[step.path] = (instance, container[step.key])
             else:
-                widget_type = value.get("widget_type")
-                widget_creators = {
-                    "button": lambda v: self.button(v.get("text", "Button"), v.get("callback")),
-                    "label": lambda v: self.label(v.get("text", "Label")),
-                    "combo_box": lambda v: self.combo_box(v.get("items", []), v.get("callback", None)),
-                    "input_box": lambda v: self.input_box(v.get("text", "Enter text")),
-                    "table": lambda v: self.table(v.get("rows"), v.get("columns"),
-                                                  v.get("data"), v.get("header"))
-                }
+                instance = self.widget_creators[step.widget_type](**args)
+                layout.addWidget(instance)
+                container[step.key] = instance
+
+            self.widgets_container[step.key] = instance
+            self.widget_registry.register(namespace + step.path, instance, step.tags)
 
-                if widget_type in widget_creators:
-                    print(widget_creators)
-                    widget = widget_creators[widget_type](value)
-                    parent_layout.addWidget(widget)
-                    self.widgets_container[key] = widget
-                    container_dict[key] = widget
-                else:
-                    print(f"UNKNOWN WIDGET TYPE: {widget_type} in {value} SKIPPING...")
         return self.widgets_container
 
     def find_widget(self, container, key_path):
         """
-        Recursively searches for a widget inside a nested dictionary.
+        Searches for a widget inside a nested dictionary. Lookups against self.widgets_container take a fully
+        qualified path, e.g. ["qvboxlayout_central_widget", "qhboxlayout_main", "start_button"], and are
+        answered from self.widget_registry in O(1). Any other container is walked as a nested dictionary.
 
         Parameters:
             container (dict): The nested dictionary storing widgets.
@@ -405,6 +461,11 @@ class MainWindow(QMainWindow, WidgetsTypes):
         if not key_path:
             return None  # No path provided
 
+        if container is self.widgets_container:
+            widget = self.widget_registry.get(key_path)
+            if widget is not None:
+                return widget
+
         key = key_path[0]
 
         if key in container:
@@ -415,6 +476,15 @@ class MainWindow(QMainWindow, WidgetsTypes):
 
         return None  # Key not found
 
+    def set_widgets_enabled(self, tag, enabled):
+        """
+        Enables or disables every widget registered with tag, e.g. every "write" button for a Class D viewer.
+
+        Returns:
+            int: Number of widgets updated.
+        """
+        return self.widget_registry.set_enabled(tag, enabled)
+
     def apply_stylesheet_to_all_layout(self, css_dict):
         stylesheet = ""
         for selector, styles in css_dict.items():
@@ -444,6 +514,7 @@ class MainWindow(QMainWindow, WidgetsTypes):
 
 
         recursive_clear(self.main_layout)  # Start clearing from the main layout
+        self.widget_registry.clear(keep=[("qvboxlayout_central_widget",)])
         self.widgets_container = self.filter_nested_dict(self.widgets_container, "qvboxlayout_central_widget")
 
     @staticmethod
@@ -0,0 +1,266 @@
+from collections import OrderedDict, namedtuple
+
+
+# Layout prefixes understood by MainWindow.add_flexible_ribbon (matched case insensitive).
+CONTAINER_PREFIXES = {
+    "qhboxlayout_": "qhboxlayout",
+    "qvboxlayout_": "qvboxlayout",
+}
+
+_CALLABLE = "callable"
+
+# Schema of every supported widget. Maps widget_type -> {config key: (accepted types, creator kwarg, default)}.
+# The creator kwarg is the name of the parameter on WidgetsTypes that receives the value.
+WIDGET_SCHEMA = {
+    "button": {
+        "text": ((str,), "text", "Button"),
+        "callback": (_CALLABLE, "on_click", None),
+    },
+    "label": {
+        "text": ((str,), "text", "Label"),
+    },
+    "combo_box": {
+        "items": ((list, tuple), "items", ()),
+        "callback": (_CALLABLE, "callback", None),
+        "label_text": ((str,), None, None),
+    },
+    "input_box": {
+        "text": ((str,), "placeholder", "Enter text"),
+    },
+    "table": {
+        "rows": ((int,), "rows", 0),
+        "columns": ((int,), "columns", 0),
+        "data": ((list, tuple), "data", None),
+        "header": ((list, tuple), "headers", None),
+    },
+}
+
+# Per-build payloads: options whose values change from one build to the next (e.g. the rows of a table).
+# They are left out of the cache key and of the cached plan, RibbonPlan.bind reads them from the config.
+PAYLOAD_OPTIONS = {
+    "table": ("data",),
+}
+
+# Keys accepted on every widget, they are validated but not forwarded to the creators.
+COMMON_KEYS = {
+    "widget_type": (str,),
+    "style": (str, dict),
+    "hover_style": (str, dict),
+    "tags": (list, tuple),
+}
+
+LAYOUT = "layout"
+WIDGET = "widget"
+
+RibbonStep = namedtuple("RibbonStep", ["path", "parent", "key", "kind", "widget_type", "args", "tags", "payload"])
+RibbonStep.__doc__ = """
+One instruction of a compiled ribbon.
+
+    path (tuple): Fully qualified key path of the element, e.g. ("qhboxlayout_main", "start_button").
+    parent (tuple): Key path of the layout the element is added to, () for the ribbon root.
+    key (str): Last element of the path, the key used inside the config.
+    kind (str): LAYOUT or WIDGET.
+    widget_type (str): "qhboxlayout"/"qvboxlayout" for layouts, the widget_type for widgets.
+    args (dict): Keyword arguments for the WidgetsTypes creator (empty for layouts), without the payloads.
+    tags (tuple): Role / tag names of the widget (e.g. "write"), used by WidgetRegistry for bulk operations.
+    payload (tuple): (config key, creator kwarg) pairs of the PAYLOAD_OPTIONS filled in by RibbonPlan.bind.
+"""
+
+
+class RibbonConfigError(ValueError):
+    """Raised when a ribbon configuration does not match the schema. Holds every problem found."""
+
+    def __init__(self, errors):
+        self.errors = list(errors)
+        super().__init__("Invalid ribbon config:\n  " + "\n  ".join(self.errors))
+
+
+class RibbonPlan:
+    """
+    Flat, validated build plan of a ribbon config.
+
+    Steps are stored parent-first (the order the recursive builder used to create them), so a builder
+    can walk the plan once and always find the parent layout of a step already created. The plan only
+    describes the structure, per-build payloads are taken from the config by bind.
+    """
+
+    def __init__(self, steps):
+        self.steps = tuple(steps)
+        self.paths = tuple(step.path for step in self.steps)
+
+    def __iter__(self):
+        return iter(self.steps)
+
+    def __len__(self):
+        return len(self.steps)
+
+    def bind(self, ribbon_config):
+        """
+        Yields (step, creator kwargs) for every step, with the payloads read from ribbon_config.
+
+        Raises:
+            RibbonConfigError: If a payload has an invalid value.
+        """
+        for step in self.steps:
+            if not step.payload:
+                yield step, step.args
+                continue
+
+            value = ribbon_config
+            for key in step.path:
+                value = value[key]
+            args, errors = dict(step.args), []
+            for option, kwarg in step.payload:
+                option_value = value.get(option)
+                expected, _, default = WIDGET_SCHEMA[step.widget_type][option]
+                if not RibbonCompiler._matches(option_value, expected):
+                    errors.append(f"{RibbonCompiler._where(step.path)}: {option!r} has invalid value "
+                                  f"of type {type(option_value).__name__}")
+                else:
+                    args[kwarg] = default if option_value is None else option_value
+            if errors:
+                raise RibbonConfigError(errors)
+            yield step, args
+
+
+class RibbonCompiler:
+    """
+    Validates ribbon configs once against WIDGET_SCHEMA / CONTAINER_PREFIXES and compiles them into
+    RibbonPlan objects. Plans are cached per config structure (by content, PAYLOAD_OPTIONS excluded), so
+    showing the same screen again, even with new table rows, skips validation and classification.
+    """
+
+    def __init__(self, cache_size=64):
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+
+    def compile(self, ribbon_config):
+        """
+        Returns the (cached) RibbonPlan of ribbon_config. Pass ribbon_config to plan.bind when building it.
+
+        Raises:
+            RibbonConfigError: If the config contains unknown layouts, widget types, keys or bad values.
+        """
+        try:
+            cache_key = self._structure(ribbon_config)
+        except TypeError:
+            cache_key = None  # Unhashable values inside the config, compile without caching.
+
+        if cache_key is not None and cache_key in self._cache:
+            self._cache.move_to_end(cache_key)
+            return self._cache[cache_key]
+
+        steps, errors = [], []
+        self._compile_level(ribbon_config, (), steps, errors)
+        if errors:
+            raise RibbonConfigError(errors)
+
+        plan = RibbonPlan(steps)
+        if cache_key is not None:
+            self._cache[cache_key] = plan
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return plan
+
+    def clear_cache(self):
+        self._cache.clear()
+
+    def _compile_level(self, config, parent, steps, errors):
+        if not isinstance(config, dict):
+            errors.append(f"{self._where(parent)}: expected a dict, got {type(config).__name__}")
+            return
+
+        for key, value in config.items():
+            path = parent + (key,)
+            if not isinstance(value, dict):
+                errors.append(f"{self._where(path)}: expected a dict, got {type(value).__name__}")
+            elif "widget_type" in value:
+                self._compile_widget(key, value, path, parent, steps, errors)
+            else:
+                layout_type = self._layout_type(key)
+                if layout_type is None:
+                    errors.append(f"{self._where(path)}: unknown layout, key must start with one of "
+                                  f"{', '.join(CONTAINER_PREFIXES)}")
+                    continue
+                steps.append(RibbonStep(path, parent, key, LAYOUT, layout_type, {}, (), ()))
+                self._compile_level(value, path, steps, errors)
+
+    def _compile_widget(self, key, value, path, parent, steps, errors):
+        widget_type = value["widget_type"]
+        schema = WIDGET_SCHEMA.get(widget_type)
+        if schema is None:
+            errors.append(f"{self._where(path)}: unknown widget_type {widget_type!r}, expected one of "
+                          f"{', '.join(WIDGET_SCHEMA)}")
+            return
+
+        payload_options = PAYLOAD_OPTIONS.get(widget_type, ())
+        args, payload = {}, []
+        for option, (types, kwarg, default) in schema.items():
+            if option in payload_options:
+                payload.append((option, kwarg))
+            elif kwarg is not None:
+                args[kwarg] = default
+
+        for option, option_value in value.items():
+            if option in COMMON_KEYS:
+                expected = COMMON_KEYS[option]
+            elif option in schema:
+                expected, kwarg, _ = schema[option]
+            else:
+                errors.append(f"{self._where(path)}: unknown key {option!r} for widget_type {widget_type!r}")
+                continue
+
+            if not self._matches(option_value, expected):
+                errors.append(f"{self._where(path)}: {option!r} has invalid value {option_value!r}")
+            elif option == "tags" and not all(isinstance(tag, str) for tag in option_value):
+                errors.append(f"{self._where(path)}: 'tags' must only contain strings")
+            elif option in schema and kwarg is not None and option_value is not None \
+                    and option not in payload_options:
+                args[kwarg] = option_value
+
+        tags = tuple(value.get("tags") or ())
+        steps.append(RibbonStep(path, parent, key, WIDGET, widget_type, args, tags, tuple(payload)))
+
+    @staticmethod
+    def _layout_type(key):
+        key_lowered = key.lower()
+        for prefix, layout_type in CONTAINER_PREFIXES.items():
+            if key_lowered.startswith(prefix):
+                return layout_type
+        return None
+
+    @staticmethod
+    def _matches(value, expected):
+        if value is None:
+            return True  # Missing values fall back to the creator defaults.
+        if expected == _CALLABLE:
+            return callable(value)
+        # bool is an int subclass, but True rows / columns is never intended.
+        if isinstance(value, bool) and bool not in expected:
+            return False
+        return isinstance(value, expected)
+
+    @staticmethod
+    def _where(path):
+        return " > ".join(path) if path else "<root>"
+
+    @classmethod
+    def _structure(cls, config):
+        """Cache key of a config: its frozen content without the PAYLOAD_OPTIONS values."""
+        if not isinstance(config, dict):
+            return cls._freeze(config)
+        payload_options = ()
+        if isinstance(config.get("widget_type"), str):
+            payload_options = PAYLOAD_OPTIONS.get(config["widget_type"], ())
+        return ("d",) + tuple((key, cls._structure(item)) for key, item in config.items()
+                              if key not in payload_options)
+
+    @classmethod
+    def _freeze(cls, value):
+        """Hashable, order preserving snapshot of a config used as the cache key."""
+        if isinstance(value, dict):
+            return ("d",) + tuple((key, cls._freeze(item)) for key, item in value.items())
+        if isinstance(value, (list, tuple)):
+            return ("l",) + tuple(cls._freeze(item) for item in value)
+        hash(value)
+        return value
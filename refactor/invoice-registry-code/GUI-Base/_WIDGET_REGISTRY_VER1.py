@@ -0,0 +1,142 @@
+from collections import defaultdict
+from itertools import count
+
+
+class WidgetRegistry:
+    """
+    Flat registry of widgets and layouts with constant-time lookups by:
+        - fully qualified key path, e.g. ("qhboxlayout_main", "start_button") or "qhboxlayout_main.start_button"
+        - type name, e.g. "QPushButton"
+        - tag / role, e.g. "write" for every button that modifies the database
+
+    Widgets that expose Qt's destroyed signal remove themselves from the registry when they are deleted,
+    so entries never outlive the widgets they point to.
+    """
+
+    def __init__(self):
+        self._by_path = {}
+        self._by_type = defaultdict(dict)  # type name -> {path: widget}
+        self._by_tag = defaultdict(dict)  # tag -> {path: widget}
+        self._entries = {}  # path -> (type name, tags, registration token)
+        self._paths = {}  # id(widget) -> path it was last registered under
+        self._tokens = count()
+
+    @staticmethod
+    def normalize_path(path):
+        """Returns the tuple form of a key path given as a tuple, list or dot separated string."""
+        if isinstance(path, str):
+            return tuple(path.split("."))
+        return tuple(path)
+
+    def register(self, path, widget, tags=()):
+        """
+        Adds (or replaces) the widget stored under path.
+
+        Parameters:
+            path (tuple | list | str): Fully qualified key path of the widget.
+            widget (QWidget | QLayout): The instance to register.
+            tags (iterable of str, optional): Tags / roles used by by_tag and set_enabled.
+
+        Returns:
+            tuple: The normalized key path.
+        """
+        path = self.normalize_path(path)
+        if path in self._by_path:
+            self.unregister(path)
+
+        type_name = type(widget).__name__
+        tags = tuple(tags)
+        token = next(self._tokens)
+
+        self._by_path[path] = widget
+        self._by_type[type_name][path] = widget
+        for tag in tags:
+            self._by_tag[tag][path] = widget
+        self._entries[path] = (type_name, tags, token)
+        self._paths[id(widget)] = path
+
+        destroyed = getattr(widget, "destroyed", None)
+        if destroyed is not None:
+            # The token makes a late signal from a replaced widget a no-op for its successor.
+            destroyed.connect(lambda *_, p=path, t=token: self._on_destroyed(p, t))
+        return path
+
+    def unregister(self, path):
+        """Removes path from every index. Returns the widget that was registered, or None."""
+        path = self.normalize_path(path)
+        widget = self._by_path.pop(path, None)
+        entry = self._entries.pop(path, None)
+        if entry is None:
+            return None
+
+        type_name, tags, _ = entry
+        if self._paths.get(id(widget)) == path:
+            del self._paths[id(widget)]
+        self._discard(self._by_type, type_name, path)
+        for tag in tags:
+            self._discard(self._by_tag, tag, path)
+        return widget
+
+    def clear(self, keep=()):
+        """Unregisters every path except the ones listed in keep."""
+        keep = {self.normalize_path(path) for path in keep}
+        for path in [path for path in self._by_path if path not in keep]:
+            self.unregister(path)
+
+    def get(self, path, default=None):
+        return self._by_path.get(self.normalize_path(path), default)
+
+    def path_of(self, widget):
+        """Returns the key path widget is registered under, or None when it is not registered."""
+        path = self._paths.get(id(widget))
+        if path is not None and self._by_path.get(path) is widget:
+            return path
+        return None
+
+    def by_type(self, widget_type):
+        """Returns every registered instance of widget_type (a class or its name), exact type match."""
+        type_name = widget_type if isinstance(widget_type, str) else widget_type.__name__
+        return list(self._by_type.get(type_name, {}).values())
+
+    def by_tag(self, tag):
+        """Returns every registered instance tagged with tag."""
+        return list(self._by_tag.get(tag, {}).values())
+
+    def tags_of(self, path):
+        entry = self._entries.get(self.normalize_path(path))
+        return entry[1] if entry else ()
+
+    def set_enabled(self, tag, enabled):
+        """
+        Enables or disables every widget tagged with tag, e.g. every "write" button for a read-only role.
+
+        Returns:
+            int: Number of widgets updated.
+        """
+        widgets = self.by_tag(tag)
+        for widget in widgets:
+            widget.setEnabled(enabled)
+        return len(widgets)
+
+    def _on_destroyed(self, path, token):
+        entry = self._entries.get(path)
+        if entry is not None and entry[2] == token:
+            self.unregister(path)
+
+    @staticmethod
+    def _discard(index, key, path):
+        bucket = index.get(key)
+        if bucket is None:
+            return
+        bucket.pop(path, None)
+        if not bucket:
+            del index[key]
+
+    def __contains__(self, path):
+        return self.normalize_path(path) in self._by_path
+
+    def __len__(self):
+        return len(self._by_path)
+
+    def __iter__(self):
+        return iter(self._by_path.items())
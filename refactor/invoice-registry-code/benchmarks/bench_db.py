@@ -0,0 +1,325 @@
+"""
+Throughput benchmarks for the database and CRUD layers.
+
+Usage (from refactor/invoice-registry-code):
+    python -m benchmarks.bench_db --sizes 10k 1M --out results.json
+    python -m benchmarks.bench_db --sizes 10k --compare previous_release.json
+
+Each size gets its own synthetic database (see benchmarks/data_generator.py), kept in --workdir so
+reruns with --reuse skip the load. The kept file stays exactly as generated: the write benchmarks run
+on a fresh copy of it, so reused runs measure the same data every time. Results are written as JSON, --compare prints the ops/s ratio per
+case against an earlier result file and exits with status 1 when a case regressed past --tolerance.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import timedelta
+
+from db.Inv_DB import TableMaker
+from db.Report_Runner import ReportRunner, vendor_statements
+from benchmarks import data_generator
+
+
+class Results:
+    """Collects benchmark cases as JSON-serializable dicts"""
+
+    def __init__(self):
+        self.cases = []
+
+    def add(self, name: str, size: str, ops: int, seconds: float, latencies=None, **extra):
+        case = {
+            "name": name,
+            "size": size,
+            "ops": ops,
+            "seconds": round(seconds, 6),
+            "ops_per_s": round(ops / seconds, 2) if seconds else None,
+        }
+        if latencies:
+            ordered = sorted(latencies)
+            case["p50_ms"] = round(statistics.median(ordered) * 1000, 4)
+            case["p99_ms"] = round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000, 4)
+        case.update(extra)
+        self.cases.append(case)
+        print(f"  {name:<28} {ops:>9} ops  {seconds:9.3f}s  "
+              f"{case['ops_per_s'] or 0:>12,.1f} ops/s  p99 {case.get('p99_ms', '-')} ms")
+        return case
+
+
+def timed_calls(func, args_list):
+    """Run func(*args) for each args, returns (total seconds, per-call latencies, results)"""
+    latencies, results = [], []
+    start = time.perf_counter()
+    for args in args_list:
+        call_start = time.perf_counter()
+        results.append(func(*args))
+        latencies.append(time.perf_counter() - call_start)
+    return time.perf_counter() - start, latencies, results
+
+
+def bench_inserts(db: TableMaker, results: Results, size: str, rng: random.Random):
+    def invoice(i):
+        return {"invoice_number": f"BENCH-{i}", "vendor_name": "Bench Vendor",
+                "date": "2025-01-01", "due_date": "2025-02-01", "price": rng.randrange(10, 50_000)}
+
+    seconds, latencies, _ = timed_calls(db.create, [("invoices", invoice(i)) for i in range(200)])
+    results.add("single_insert", size, 200, seconds, latencies)
+
+    sql = ("INSERT INTO invoices (invoice_number, vendor_name, date, due_date, price) "
+           "VALUES (:invoice_number, :vendor_name, :date, :due_date, :price)")
+    operations = [(sql, db._to_storage("invoices", invoice(i))) for i in range(10_000)]
+    start = time.perf_counter()
+    db.transaction_dict(operations)
+    results.add("bulk_insert_transaction", size, len(operations), time.perf_counter() - start)
+
+
+def bench_note_edits(db: TableMaker, results: Results, size: str, rows: int, rng: random.Random):
+    note_count = max(1, rows // 4)
+    edits = [(rng.randrange(1, note_count + 1), {"price": rng.randrange(1, 1000)}) for _ in range(1000)]
+    start = time.perf_counter()
+    db.bulk_update_notes(edits)
+    results.add("bulk_note_update", size, len(edits), time.perf_counter() - start)
+
+
+def bench_reads(db: TableMaker, results: Results, size: str, rows: int, rng: random.Random):
+    vendors = data_generator.vendor_names(rows)
+    seconds, latencies, found = timed_calls(
+        db.read, [("invoices", {"vendor_name": rng.choice(vendors)}) for _ in range(50)]
+    )
+    results.add("filtered_read_vendor", size, 50, seconds, latencies,
+                rows_per_call=round(sum(map(len, found)) / len(found), 1))
+
+    seconds, latencies, _ = timed_calls(
+        db.read, [("invoices", {"ID": rng.randrange(1, rows + 1)}) for _ in range(500)]
+    )
+    results.add("point_read_id", size, 500, seconds, latencies)
+
+
+def bench_pagination(db: TableMaker, results: Results, size: str, rows: int):
+    page = 100
+    depths = [int(rows * fraction) for fraction in (0, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99)]
+
+    seconds, latencies, _ = timed_calls(db.fetch_all_dict, [
+        ("SELECT * FROM invoices ORDER BY ID LIMIT :limit OFFSET :offset", {"limit": page, "offset": depth})
+        for depth in depths
+    ])
+    results.add("pagination_offset", size, len(depths), seconds, latencies)
+
+    seconds, latencies, _ = timed_calls(db.fetch_all_dict, [
+        ("SELECT * FROM invoices WHERE ID > :last ORDER BY ID LIMIT :limit", {"limit": page, "last": depth})
+        for depth in depths
+    ])
+    results.add("pagination_keyset", size, len(depths), seconds, latencies)
+
+
+def bench_summaries(db: TableMaker, results: Results, size: str, rng: random.Random):
+    # The daily_summary view joins on due_date, a full scan of it grows quadratically with rows per
+    # date, so it is sampled per due date the way the dashboard reads it.
+    due_dates = [(data_generator.START_DATE + timedelta(days=rng.randrange(30, 790))).isoformat()
+                 for _ in range(10)]
+    seconds, latencies, _ = timed_calls(db.fetch_all_dict, [
+        ("SELECT * FROM daily_summary WHERE due_date = :due_date", {"due_date": due_date})
+        for due_date in due_dates
+    ])
+    results.add("daily_summary_by_date", size, len(due_dates), seconds, latencies)
+
+    start = time.perf_counter()
+    db.fetch_all_dict(
+        "SELECT invoices.vendor_name AS vendor, SUM(outstanding_table.outstanding) AS total "
+        "FROM outstanding_table JOIN invoices ON invoices.ID = outstanding_table.invoice_id "
+        "GROUP BY invoices.vendor_name"
+    )
+    results.add("vendor_outstanding_totals", size, 1, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    db.fetch_all_dict(
+        """
+        SELECT CASE
+                   WHEN age <= 0 THEN 'current'
+                   WHEN age <= 30 THEN '1-30'
+                   WHEN age <= 60 THEN '31-60'
+                   WHEN age <= 90 THEN '61-90'
+                   ELSE '90+'
+               END AS bucket,
+               COUNT(*) AS invoices,
+               SUM(outstanding) AS total
+        FROM (SELECT julianday(:today) - julianday(due_date) AS age, outstanding
+              FROM outstanding_table WHERE outstanding > 0)
+        GROUP BY bucket
+        """,
+        {"today": "2025-06-30"}
+    )
+    results.add("aging_buckets", size, 1, time.perf_counter() - start)
+
+
+def bench_concurrent_writers(db: TableMaker, results: Results, size: str, writers: int = 4, per_writer: int = 50):
+    latencies, failures = [], []
+    lock = threading.Lock()
+
+    def writer(worker: int):
+        local = []
+        for i in range(per_writer):
+            start = time.perf_counter()
+            row_id = db.create("logs", {"username": f"writer{worker}", "role": "Class A",
+                                        "event": f"Concurrent {i}", "event_type": "insert", "date": i})
+            local.append(time.perf_counter() - start)
+            if row_id is None:
+                failures.append(1)
+        with lock:
+            latencies.extend(local)
+
+    threads = [threading.Thread(target=writer, args=(worker,)) for worker in range(writers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    results.add("concurrent_writers", size, writers * per_writer, time.perf_counter() - start, latencies,
+                writers=writers, failures=len(failures))
+
+
+def bench_reports(db_path: str, results: Results, size: str):
+    """Vendor statements on 1 process and on every core, to check the process pool scales"""
+    partitions = ReportRunner(db_path).vendor_partitions(vendors_per_partition=20)
+    for processes in sorted({1, os.cpu_count() or 1}):
+        runner = ReportRunner(db_path, processes=processes)
+        with open(os.devnull, "w", encoding="utf-8") as sink:
+            start = time.perf_counter()
+            stats = runner.run(vendor_statements, partitions, sink.write)
+        results.add(f"vendor_statements_{processes}p", size, stats["items"], time.perf_counter() - start,
+                    processes=processes)
+
+
+def remove_database(db_path: str):
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+
+
+def prepare_dataset(size: str, workdir: str, reuse: bool, seed: int = 7, results: Results = None):
+    """
+    Pristine synthetic database of size in workdir, regenerated unless reuse finds one.
+    Returns (invoice count, path). Load timings are added to results when given.
+    """
+    rows = data_generator.parse_size(size)
+    db_path = os.path.join(workdir, f"bench_{size}.db")
+    print(f"\n== {size} ({rows:,} invoices) -> {db_path}")
+
+    if not (reuse and os.path.exists(db_path)):
+        remove_database(db_path)
+        loaded = data_generator.load_dataset(db_path, rows, seed)
+        if results is not None:
+            for table, (count, seconds) in loaded.items():
+                results.add(f"load_{table}", size, count, seconds)
+    return rows, db_path
+
+
+def working_copy(db_path: str) -> str:
+    """Fresh copy of a pristine database for benchmarks that write, so the pristine file never drifts"""
+    copy_path = db_path[:-len(".db")] + ".run.db"
+    remove_database(copy_path)
+    source, target = sqlite3.connect(db_path), sqlite3.connect(copy_path)
+    try:
+        source.backup(target)  # Consistent copy, WAL content included
+    finally:
+        target.close()
+        source.close()
+    return copy_path
+
+
+def run_size(size: str, workdir: str, reuse: bool, results: Results, seed: int = 7):
+    rows, pristine_path = prepare_dataset(size, workdir, reuse, seed, results)
+    db_path = working_copy(pristine_path)
+    try:
+        db = TableMaker(db_path)
+        db.instrumentation.disable()  # Measure the layers themselves, not the statistics
+        rng = random.Random(seed)
+        bench_reads(db, results, size, rows, rng)
+        bench_pagination(db, results, size, rows)
+        bench_summaries(db, results, size, rng)
+        bench_inserts(db, results, size, rng)
+        bench_note_edits(db, results, size, rows, rng)
+        bench_concurrent_writers(db, results, size)
+        bench_reports(db_path, results, size)
+    finally:
+        remove_database(db_path)
+
+
+def metadata() -> dict:
+    try:
+        revision = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                  text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git_revision": revision,
+        "python": sys.version.split()[0],
+        "sqlite": sqlite3.sqlite_version,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def compare(current: list, baseline_path: str, tolerance: float) -> bool:
+    """Print ops/s ratios against a baseline result file, returns True when nothing regressed"""
+    with open(baseline_path, encoding="utf-8") as file:
+        baseline = {(case["name"], case["size"]): case for case in json.load(file)["results"]}
+
+    ok = True
+    print(f"\n== Compared with {baseline_path} (tolerance {tolerance:.0%})")
+    for case in current:
+        old = baseline.get((case["name"], case["size"]))
+        if not old or not old.get("ops_per_s") or not case.get("ops_per_s"):
+            continue
+        ratio = case["ops_per_s"] / old["ops_per_s"]
+        regressed = ratio < 1 - tolerance
+        ok = ok and not regressed
+        print(f"  {case['name']:<28} {case['size']:>4}  {ratio:6.2f}x {'REGRESSION' if regressed else ''}")
+    return ok
+
+
+def run_benchmarks(description: str, run_size, default_out: str, argv=None) -> int:
+    """
+    Shared command line of the dataset benchmarks: run_size(size, workdir, reuse, results) per --sizes
+    entry, then write the results and compare them when asked. Returns the exit status.
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--sizes", nargs="+", default=["10k"],
+                        help="dataset sizes: 10k, 1M, 10M or a plain invoice count")
+    parser.add_argument("--workdir", default=os.path.join(tempfile.gettempdir(), "invoice_registry_bench"))
+    parser.add_argument("--reuse", action="store_true", help="reuse previously generated databases")
+    parser.add_argument("--out", default=default_out)
+    parser.add_argument("--compare", help="earlier result file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed ops/s drop before failing")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.workdir, exist_ok=True)
+    results = Results()
+    for size in args.sizes:
+        run_size(size, args.workdir, args.reuse, results)
+
+    with open(args.out, "w", encoding="utf-8") as file:
+        json.dump({"meta": metadata(), "results": results.cases}, file, indent=2)
+    print(f"\nResults written to {args.out}")
+
+    if args.compare and not compare(results.cases, args.compare, args.tolerance):
+        return 1
+    return 0
+
+
+def main(argv=None) -> int:
+    return run_benchmarks("Database / CRUD layer benchmarks", run_size, "bench_results.json", argv)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
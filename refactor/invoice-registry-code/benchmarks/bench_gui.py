@@ -0,0 +1,145 @@
+"""
+Headless rendering benchmarks for the registry screens.
+
+Usage (from refactor/invoice-registry-code, with PyQt5 and the themes module importable):
+    python -m benchmarks.bench_gui --sizes 100 1000 10000 --out gui_results.json
+    python -m benchmarks.bench_gui --compare gui_results_previous.json
+
+Runs on Qt's offscreen platform. For every screen and table size it times:
+    build         MainWindow.add_flexible_ribbon with the synthetic rows
+    populate      update_table_data with a fresh set of rows
+    theme_switch  CssManager.apply_css_to_all_widgets, once per theme in THEMES
+    teardown      clear_widgets, including the deferred deletes
+and records event-loop stalls (see GUI-Base/_FRAME_TIMER_VER1.py) during each phase. Results use the
+same JSON layout as benchmarks.bench_db, so its --compare works here too. The size of a result is the
+number of rows actually rendered, the roles screen never has more than 1000 rows.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "GUI-Base")))
+
+from PyQt5.QtWidgets import QApplication  # noqa: E402
+
+from _GUI_COMPONENT_with_themes_ver4 import MainWindow  # noqa: E402
+from _CSS_APPLIER_VER1 import CssManager  # noqa: E402
+from _FRAME_TIMER_VER1 import EventLoopStallMonitor, FrameTimer  # noqa: E402
+from themes import THEMES  # noqa: E402
+
+from benchmarks import data_generator  # noqa: E402
+from benchmarks.bench_db import Results, metadata, compare  # noqa: E402
+
+# screen -> (table headers, synthetic row generator)
+SCREENS = {
+    "invoices": (["Invoice No.", "Vendor", "Date", "Due Date", "Price"], data_generator.invoices),
+    "notes": (["Invoice ID", "Note No.", "Type", "Mode", "Price", "Reason"], data_generator.notes),
+    "payables": (["Invoice ID", "Invoice No.", "Initial", "Credits", "Debits", "Due Date", "Payment",
+                  "Outstanding"], data_generator.outstanding),
+    "logs": (["Username", "Role", "Event", "Type", "Date"], data_generator.logs),
+    "roles": (["Username", "Role", "Created", "Last Active", "Insertions", "Deletions", "Modifications"],
+              data_generator.roles),
+}
+
+
+def screen_rows(screen: str, rows: int, seed: int) -> list:
+    _, generator = SCREENS[screen]
+    # notes / roles generators size themselves from the invoice count, scale them back up to `rows`.
+    scale = {"notes": 4, "roles": 100}.get(screen, 1)
+    return list(generator(rows * scale, seed))[:rows]
+
+
+def ribbon_config(screen: str, data: list) -> dict:
+    headers, _ = SCREENS[screen]
+    return {
+        "qhboxlayout_toolbar": {
+            "title_label": {"widget_type": "label", "text": screen.title()},
+            "screen_selector": {"widget_type": "combo_box", "items": list(SCREENS)},
+            "search_box": {"widget_type": "input_box", "text": "Search"},
+            "add_button": {"widget_type": "button", "text": "Add", "tags": ["write"]},
+            "delete_button": {"widget_type": "button", "text": "Delete", "tags": ["write"]},
+        },
+        "qvboxlayout_body": {
+            "data_table": {"widget_type": "table", "rows": len(data), "columns": len(headers),
+                           "data": data, "header": headers},
+        },
+    }
+
+
+def run_phase(results: Results, monitor: EventLoopStallMonitor, name: str, size: str, func, **extra):
+    monitor.reset()
+    with FrameTimer(name) as frame:
+        func()
+    results.add(name, size, 1, frame.elapsed_ms / 1000, **monitor.summary(), **extra)
+
+
+def run_screen(window: MainWindow, results: Results, monitor: EventLoopStallMonitor, screen: str, rows: int,
+               seed: int):
+    data = screen_rows(screen, rows, seed)
+    fresh = screen_rows(screen, rows, seed + 1)
+    config = ribbon_config(screen, data)
+    # Label results with the rows actually rendered, the roles generator stops at 1000 users.
+    size = str(len(data))
+    if len(data) < rows:
+        print(f"  {screen}: only {len(data):,} of {rows:,} rows available")
+
+    run_phase(results, monitor, f"build_{screen}", size,
+              lambda: window.add_flexible_ribbon(config, window.main_layout, {}), requested_rows=rows)
+
+    table = window.find_widget(window.widgets_container,
+                               ["qvboxlayout_central_widget", "qvboxlayout_body", "data_table"])
+    run_phase(results, monitor, f"populate_{screen}", size, lambda: window.update_table_data(table, fresh),
+              requested_rows=rows)
+
+    for theme_name, theme in THEMES.items():
+        css_manager = CssManager(theme)
+        run_phase(results, monitor, f"theme_{theme_name}_{screen}", size,
+                  lambda: css_manager.apply_css_to_all_widgets(window.widgets_container))
+
+    run_phase(results, monitor, f"teardown_{screen}", size, window.clear_widgets)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Headless GUI rendering benchmarks")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[100, 1000, 10000], help="table row counts")
+    parser.add_argument("--screens", nargs="+", default=list(SCREENS), choices=list(SCREENS))
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--out", default="gui_bench_results.json")
+    parser.add_argument("--compare", help="earlier result file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed ops/s drop before failing")
+    args = parser.parse_args(argv)
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    window = MainWindow(screen_name="Registry benchmark")
+    window.show()
+    monitor = EventLoopStallMonitor()
+    monitor.start()
+    app.processEvents()
+
+    results = Results()
+    start = time.perf_counter()
+    for rows in args.sizes:
+        print(f"\n== {rows:,} rows")
+        for screen in args.screens:
+            run_screen(window, results, monitor, screen, rows, args.seed)
+    monitor.stop()
+    print(f"\nTotal {time.perf_counter() - start:.2f}s")
+
+    meta = metadata()
+    meta["qt_platform"] = os.environ["QT_QPA_PLATFORM"]
+    with open(args.out, "w", encoding="utf-8") as file:
+        json.dump({"meta": meta, "results": results.cases}, file, indent=2)
+    print(f"Results written to {args.out}")
+
+    window.close()
+    if args.compare and not compare(results.cases, args.compare, args.tolerance):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
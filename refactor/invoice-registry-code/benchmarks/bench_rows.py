@@ -0,0 +1,61 @@
+"""
+Time and memory of each SQLiteDatabase.fetch_all row mode on a large result set.
+
+Usage (from refactor/invoice-registry-code):
+    python -m benchmarks.bench_rows --sizes 10k 1M --out rows_results.json
+    python -m benchmarks.bench_rows --sizes 1M --reuse --compare rows_previous.json
+
+Reads every invoice (SELECT * FROM invoices) once per mode: dict, tuple, record and columnar. Memory is
+the tracemalloc peak while fetching plus what the result still holds afterwards, so the dict baseline
+and the compact modes can be compared directly. Datasets are shared with benchmarks.bench_db; this
+benchmark only reads, so it runs on the pristine file directly.
+"""
+
+import gc
+import sys
+import time
+import tracemalloc
+
+from db.Inv_DB import TableMaker
+from benchmarks.bench_db import Results, prepare_dataset, run_benchmarks
+
+ROW_MODES = ("dict", "tuple", "record", "columnar")
+QUERY = "SELECT * FROM invoices"
+
+
+def measure(db: TableMaker, row_mode: str):
+    """Returns (seconds, row count, peak bytes, retained bytes) for one full read"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = db.fetch_all(QUERY, row_mode=row_mode)
+    seconds = time.perf_counter() - start
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    count = len(result)
+    del result
+    return seconds, count, peak, retained
+
+
+def run_size(size: str, workdir: str, reuse: bool, results: Results, seed: int = 7):
+    _, db_path = prepare_dataset(size, workdir, reuse, seed)
+    db = TableMaker(db_path)
+    db.instrumentation.disable()
+    db.disable_query_cache()  # The dict mode would otherwise keep its result alive in the cache
+
+    baseline = None
+    for row_mode in ROW_MODES:
+        seconds, count, peak, retained = measure(db, row_mode)
+        baseline = baseline or retained
+        results.add(f"fetch_all_{row_mode}", size, count, seconds,
+                    peak_mb=round(peak / 2 ** 20, 2), retained_mb=round(retained / 2 ** 20, 2),
+                    bytes_per_row=round(retained / count, 1) if count else None,
+                    memory_vs_dict=round(retained / baseline, 3) if baseline else None)
+
+
+def main(argv=None) -> int:
+    return run_benchmarks("Row representation benchmarks", run_size, "rows_bench_results.json", argv)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
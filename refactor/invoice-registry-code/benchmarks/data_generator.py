@@ -0,0 +1,139 @@
+"""
+Synthetic registry data for the benchmarks.
+
+Rows are generated deterministically from a seed and bulk loaded straight into a TableMaker schema,
+money values already in integer minor units (see Modulation.Money).
+
+Dataset shape for `rows` invoices:
+    invoices              rows
+    outstanding_table     rows (one payment / balance row per invoice)
+    credits_debits_notes  rows // 4
+    logs                  rows
+    roles                 clamp(rows // 100, 10, 1000)
+"""
+
+import random
+import sqlite3
+import time
+from datetime import date, timedelta
+
+from db.Inv_DB import TableMaker
+
+SIZES = {"10k": 10_000, "1M": 1_000_000, "10M": 10_000_000}
+START_DATE = date(2024, 1, 1)
+LOAD_BATCH = 50_000
+
+
+def parse_size(size: str) -> int:
+    """Accepts the SIZES labels ("10k", "1M", "10M") or a plain row count"""
+    return SIZES[size] if size in SIZES else int(size)
+
+
+def vendor_names(rows: int) -> list:
+    return [f"Vendor {i:05d}" for i in range(max(50, rows // 200))]
+
+
+def invoices(rows: int, seed: int = 7):
+    rng = random.Random(seed)
+    vendors = vendor_names(rows)
+    for i in range(1, rows + 1):
+        issued = START_DATE + timedelta(days=rng.randrange(730))
+        yield (
+            f"INV-{i:08d}",
+            rng.choice(vendors),
+            issued.isoformat(),
+            (issued + timedelta(days=rng.choice((15, 30, 45, 60)))).isoformat(),
+            rng.randrange(1_000, 5_000_000),  # 10.00 .. 50,000.00
+        )
+
+
+def outstanding(rows: int, seed: int = 7):
+    """One balance row per invoice, re-using the invoice stream so prices and due dates line up"""
+    rng = random.Random(seed + 1)
+    for invoice_id, (number, _, _, due_date, price) in enumerate(invoices(rows, seed), start=1):
+        payment = rng.choice((0, 0, price // 2, price))
+        yield (invoice_id, number, price, 0, 0, due_date, payment, price - payment)
+
+
+def notes(rows: int, seed: int = 7):
+    rng = random.Random(seed + 2)
+    for i in range(1, rows // 4 + 1):
+        yield (
+            rng.randrange(1, rows + 1),
+            f"NOTE-{i:08d}",
+            rng.choice(("Credit", "Debit")),
+            rng.choice(("Cash", "Bank", "Cheque")),
+            rng.randrange(100, 100_000),
+            "Synthetic adjustment",
+        )
+
+
+def logs(rows: int, seed: int = 7):
+    rng = random.Random(seed + 3)
+    for i in range(rows):
+        yield (
+            f"user{rng.randrange(100):03d}",
+            rng.choice(("Class A", "Class B", "Class C", "Class D")),
+            f"Event {i}",
+            rng.choice(("insert", "update", "delete", "login")),
+            int(time.mktime(START_DATE.timetuple())) + i,
+        )
+
+
+def roles(rows: int, seed: int = 7):
+    rng = random.Random(seed + 4)
+    for i in range(min(1000, max(10, rows // 100))):
+        yield (
+            f"user{i:03d}",
+            rng.choice(("Class A", "Class B", "Class C", "Class D")),
+            START_DATE.isoformat(),
+            START_DATE.isoformat(),
+            rng.randrange(1000), rng.randrange(100), rng.randrange(500),
+        )
+
+
+TABLE_LOADERS = (
+    ("invoices", "INSERT INTO invoices (invoice_number, vendor_name, date, due_date, price) "
+                 "VALUES (?, ?, ?, ?, ?)", invoices),
+    ("outstanding_table", "INSERT INTO outstanding_table (invoice_id, invoice_number, initial_price, "
+                          "total_credits, total_debits, due_date, payment, outstanding) "
+                          "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", outstanding),
+    ("credits_debits_notes", "INSERT INTO credits_debits_notes (invoice_id, note_number, note_type, "
+                             "transaction_mode, price, reason) VALUES (?, ?, ?, ?, ?, ?)", notes),
+    ("logs", "INSERT INTO logs (username, role, event, event_type, date) VALUES (?, ?, ?, ?, ?)", logs),
+    ("roles", "INSERT INTO roles (username, role, date_of_creation, last_active, total_insertions, "
+              "total_deletions, total_modifications) VALUES (?, ?, ?, ?, ?, ?, ?)", roles),
+)
+
+
+def load_dataset(db_path: str, rows: int, seed: int = 7, progress=None) -> dict:
+    """
+    Create the TableMaker schema at db_path and bulk load the synthetic dataset.
+    Returns {table: (row count, seconds)}.
+    """
+    TableMaker(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA synchronous = OFF")  # Loading only, the benchmarks reopen with the app settings
+    loaded = {}
+    try:
+        for table, sql, generator in TABLE_LOADERS:
+            start = time.perf_counter()
+            count = 0
+            batch = []
+            for row in generator(rows, seed):
+                batch.append(row)
+                if len(batch) >= LOAD_BATCH:
+                    with conn:
+                        conn.executemany(sql, batch)
+                    count += len(batch)
+                    batch = []
+                    if progress:
+                        progress(table, count)
+            if batch:
+                with conn:
+                    conn.executemany(sql, batch)
+                count += len(batch)
+            loaded[table] = (count, time.perf_counter() - start)
+    finally:
+        conn.close()
+    return loaded
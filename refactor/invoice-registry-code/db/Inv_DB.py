@@ -1,10 +1,31 @@
 import os
+import sqlite3
+from typing import Optional, List, Tuple
 from db.Modulated_Database_Constructor import Modulation
+from db.Startup_Profiler import profiler
 
 class TableMaker(Modulation.CRUDOperations, Modulation.SQLiteDatabase):
-    def __init__(self, db):
-        Modulation.SQLiteDatabase.__init__(self, db)   # Initialized the main SQLite Database operations
-        Modulation.CRUDOperations.__init__(self, self) # Initialized the CRUD operations and gave self
+    # Money columns are stored as integer minor units (see Modulation.Money), per table.
+    MONEY_COLUMNS = {
+        "invoices": ("price",),
+        "credits_debits_notes": ("price",),
+        "outstanding_table": ("initial_price", "total_credits", "total_debits", "payment", "outstanding"),
+        "daily_summary": ("total_outstanding", "total_payment"),
+    }
+    MONEY_TABLES = ("invoices", "credits_debits_notes", "outstanding_table")  # MONEY_COLUMNS minus views
+    # Tables journaled to the change feed (see Modulation.ChangeFeed), with the key column recorded per change.
+    FEED_TABLES = {
+        "invoices": "ID",
+        "credits_debits_notes": "ID",
+        "outstanding_table": "invoice_id",  # No INTEGER PRIMARY KEY, its rowid can change on VACUUM
+        "roles": "ID",
+    }
+
+    def __init__(self, db, currency="USD"):
+        with profiler.phase("TableMaker: connection settings"):
+            Modulation.SQLiteDatabase.__init__(self, db)   # Initialized the main SQLite Database operations
+        # Initialized the CRUD operations and gave self
+        Modulation.CRUDOperations.__init__(self, self, self.MONEY_COLUMNS, currency)
         # We give self because prior syntax initializes and makes the TableMaker have SQLiteDatabase
         # methods entirely, satisfying the params.
         Table1 = """
@@ -76,7 +97,35 @@ class TableMaker(Modulation.CRUDOperations, Modulation.SQLiteDatabase):
                         GROUP BY invoices.due_date;
                     """
         self.list_of_tables = [Table1, Table2, Table3, Table4, Table5, Table6]
-        self.make_tables(self.list_of_tables)
+        # Schema versions, tracked through PRAGMA user_version. Append new migrations, never edit old ones.
+        self.migrations = [
+            Modulation.Migration(1, "Initial schema", self.list_of_tables),
+            # Registries created before money moved to minor units hold major-unit amounts: scale them.
+            # On a new database the tables are still empty and this costs nothing. The conversion goes
+            # through Money.to_minor so migrated amounts round exactly like newly entered ones.
+            Modulation.Migration(2, "Money columns to integer minor units", [], [
+                Modulation.Backfill(
+                    table,
+                    ", ".join(f"{column} = to_minor({column})" for column in self.MONEY_COLUMNS[table]),
+                    functions={"to_minor": lambda value: Modulation.Money.to_minor(value, currency)},
+                ) for table in self.MONEY_TABLES
+            ]),
+            Modulation.Migration(3, "Indexes for note deltas and due date lookups", [
+                "CREATE INDEX IF NOT EXISTS idx_notes_invoice_id ON credits_debits_notes(invoice_id)",
+                "CREATE INDEX IF NOT EXISTS idx_outstanding_invoice_id ON outstanding_table(invoice_id)",
+                "CREATE INDEX IF NOT EXISTS idx_outstanding_due_date ON outstanding_table(due_date)",
+                "CREATE INDEX IF NOT EXISTS idx_invoices_due_date ON invoices(due_date)",
+            ]),
+            Modulation.Migration(4, "Index for per-vendor statements", [
+                "CREATE INDEX IF NOT EXISTS idx_invoices_vendor_name ON invoices(vendor_name)",
+            ]),
+            Modulation.Migration(5, "Change feed for downstream consumers",
+                                 Modulation.ChangeFeed.schema_statements(self.FEED_TABLES)),
+        ]
+        # A single user_version read when the schema is current, one transaction when bootstrapping.
+        with profiler.phase("TableMaker: schema check / bootstrap"):
+            self.migrate()
+        self.change_feed = Modulation.ChangeFeed(self)  # Consumer cursors over the v5 change journal
         # putting names of the tables for easing testing functions...
         self.list_of_tables = [
             "invoices", "credits_debits_notes",
@@ -87,5 +136,168 @@ class TableMaker(Modulation.CRUDOperations, Modulation.SQLiteDatabase):
     def make_tables(self, tables: list):
         for i in tables:
             self.execute_dict(i)
-    
-    
+
+    def migrate(self, target: Optional[int] = None, progress=None, pause: float = 0.0) -> int:
+        """Apply pending schema migrations (see Modulation.Migrator), returns the schema version"""
+        return Modulation.Migrator(self, self.migrations, progress, pause).migrate(target)
+
+    # ------------------------------------------------------------------------------------------------
+    # Credit / debit notes with incremental outstanding maintenance.
+    #
+    # A credit note lowers what is owed on its invoice, a debit note raises it:
+    #     outstanding = initial_price - total_credits + total_debits - payment
+    # Instead of recomputing outstanding_table, every note write applies the signed difference of the
+    # note's old and new contribution to the affected invoice rows, inside the same transaction.
+    # Prices are taken in major units and converted to minor units like every CRUD write.
+    # ------------------------------------------------------------------------------------------------
+
+    NOTE_TABLES = ("credits_debits_notes", "outstanding_table")  # Written by the note methods
+
+    @staticmethod
+    def _note_effect(note_type, price) -> tuple:
+        """Returns the (credits, debits) a note contributes to its invoice"""
+        kind = (note_type or "").strip().lower()
+        price = price or 0
+        if kind.startswith("credit"):
+            return price, 0
+        if kind.startswith("debit"):
+            return 0, price
+        return 0, 0
+
+    @classmethod
+    def _add_note_delta(cls, deltas: dict, note: dict, sign: int):
+        """Accumulates sign * effect of note into deltas ({invoice_id: [credits, debits]})"""
+        if note.get("invoice_id") is None:
+            return
+        credits, debits = cls._note_effect(note.get("note_type"), note.get("price"))
+        entry = deltas.setdefault(note["invoice_id"], [0, 0])
+        entry[0] += sign * credits
+        entry[1] += sign * debits
+
+    @staticmethod
+    def _apply_note_deltas(cursor, deltas: dict):
+        """Applies accumulated note deltas to outstanding_table in one executemany"""
+        rows = [
+            {"invoice_id": invoice_id, "credits": credits, "debits": debits}
+            for invoice_id, (credits, debits) in deltas.items()
+            if credits or debits
+        ]
+        cursor.executemany(
+            """
+            UPDATE outstanding_table
+            SET total_credits = COALESCE(total_credits, 0) + :credits,
+                total_debits = COALESCE(total_debits, 0) + :debits,
+                outstanding = COALESCE(outstanding, 0) - :credits + :debits
+            WHERE invoice_id = :invoice_id
+            """,
+            rows
+        )
+
+    def create_note(self, data: dict) -> Optional[int]:
+        """Insert a credit / debit note and apply it to its invoice balance, returns the note ID"""
+        data = self._to_storage("credits_debits_notes", data)
+        columns = ", ".join(data.keys())
+        placeholders = ", ".join(f":{k}" for k in data.keys())
+        try:
+            with self._get_connection() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                cursor = conn.cursor()
+                cursor.execute(f"INSERT INTO credits_debits_notes ({columns}) VALUES ({placeholders})", data)
+                note_id = cursor.lastrowid
+                deltas = {}
+                self._add_note_delta(deltas, data, +1)
+                self._apply_note_deltas(cursor, deltas)
+                conn.commit()
+                self.invalidate_tables(self.NOTE_TABLES)
+                return note_id
+        except sqlite3.Error as e:
+            self._log_error(e)
+            return None
+
+    def delete_note(self, note_id: int) -> int:
+        """Delete a note and reverse its effect on its invoice balance, returns number of deleted notes"""
+        try:
+            with self._get_connection() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                cursor = conn.cursor()
+                old = cursor.execute(
+                    "SELECT invoice_id, note_type, price FROM credits_debits_notes WHERE ID = ?", (note_id,)
+                ).fetchone()
+                if old is None:
+                    conn.commit()
+                    return 0
+                cursor.execute("DELETE FROM credits_debits_notes WHERE ID = ?", (note_id,))
+                deltas = {}
+                self._add_note_delta(deltas, dict(old), -1)
+                self._apply_note_deltas(cursor, deltas)
+                conn.commit()
+                self.invalidate_tables(self.NOTE_TABLES)
+                return 1
+        except sqlite3.Error as e:
+            self._log_error(e)
+            return 0
+
+    def update_note(self, note_id: int, updates: dict) -> int:
+        """Update one note (price, note_type, invoice_id, ...), adjusting only the affected balances"""
+        return self.bulk_update_notes([(note_id, updates)])
+
+    def bulk_update_notes(self, edits: List[Tuple[int, dict]], chunk_size: int = 500) -> int:
+        """
+        Apply many note edits in a single transaction.
+
+        Old rows are read once, edits to the same note are merged in order, and the net credit / debit
+        difference per invoice is written with one UPDATE per touched invoice, so thousands of edits
+        cost one pass over the notes and the affected outstanding rows only.
+        Returns the number of notes updated.
+        """
+        if not edits:
+            return 0
+
+        note_ids = list(dict.fromkeys(note_id for note_id, _ in edits))
+        try:
+            with self._get_connection() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                cursor = conn.cursor()
+
+                current = {}  # note ID -> latest state (old row merged with the edits seen so far)
+                for start in range(0, len(note_ids), chunk_size):
+                    chunk = note_ids[start:start + chunk_size]
+                    placeholders = ", ".join("?" for _ in chunk)
+                    cursor.execute(
+                        "SELECT ID, invoice_id, note_type, price FROM credits_debits_notes "
+                        f"WHERE ID IN ({placeholders})",
+                        chunk
+                    )
+                    for row in cursor.fetchall():
+                        current[row["ID"]] = dict(row)
+
+                deltas = {}
+                merged_updates = {}  # note ID -> net column updates
+                for note_id, updates in edits:
+                    old = current.get(note_id)
+                    if old is None:
+                        continue  # Unknown note, nothing to update.
+                    updates = self._to_storage("credits_debits_notes", updates)
+                    new = {**old, **updates}
+                    self._add_note_delta(deltas, old, -1)
+                    self._add_note_delta(deltas, new, +1)
+                    current[note_id] = new
+                    merged_updates.setdefault(note_id, {}).update(updates)
+
+                # Notes updating the same set of columns share one executemany.
+                groups = {}
+                for note_id, updates in merged_updates.items():
+                    groups.setdefault(tuple(updates), []).append({**updates, "cond_ID": note_id})
+                for columns, rows in groups.items():
+                    set_clause = ", ".join(f"{k} = :{k}" for k in columns)
+                    cursor.executemany(
+                        f"UPDATE credits_debits_notes SET {set_clause} WHERE ID = :cond_ID", rows
+                    )
+
+                self._apply_note_deltas(cursor, deltas)
+                conn.commit()
+                self.invalidate_tables(self.NOTE_TABLES)
+                return len(merged_updates)
+        except sqlite3.Error as e:
+            self._log_error(e)
+            return 0
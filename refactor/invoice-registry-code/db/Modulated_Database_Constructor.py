@@ -1,6 +1,14 @@
-import inspect
+import os
+import re
 import sqlite3
-from typing import Optional, List, Dict, Union, Tuple
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import deque, OrderedDict, namedtuple
+from itertools import chain
+from typing import Optional, List, Dict, Union, Tuple, Iterable, Callable
 
 
 class Modulation:
@@ -14,6 +22,11 @@ class Modulation:
         def __init__(self, db_path: str):
             self.db_path = db_path
             self.row_factory = sqlite3.Row  # Enable dictionary-like access
+            self.instrumentation = Modulation.QueryInstrumentation(db_path)
+            self.query_cache = None  # Optional Modulation.QueryCache, see enable_query_cache
+            self.maintenance = None  # Optional Modulation.MaintenanceScheduler, see start_maintenance
+            self.write_count = 0  # Write statements issued through this object, read by the maintenance jobs
+            self.last_write_at = time.monotonic()
             self._set_pragma_settings()
 
         def _set_pragma_settings(self):
@@ -28,14 +41,72 @@ class Modulation:
 
         def _get_connection(self):
             """Get connection with dictionary row factory"""
+            start = time.perf_counter()
             conn = sqlite3.connect(self.db_path)
             conn.row_factory = self.row_factory
+            if self.instrumentation.enabled:
+                self.instrumentation.record_connection(time.perf_counter() - start)
             return conn
 
+        def enable_query_cache(self, max_entries: int = 256) -> 'Modulation.QueryCache':
+            """
+            Cache SELECT results of fetch_all_dict / fetch_one_dict in this process.
+            Writes made through this object invalidate the tables they touch; writes made by other
+            processes are not seen, so only enable it where this process owns the writes.
+            """
+            self.query_cache = Modulation.QueryCache(self, max_entries)
+            return self.query_cache
+
+        def disable_query_cache(self):
+            self.query_cache = None
+
+        def start_maintenance(self, **settings) -> 'Modulation.MaintenanceScheduler':
+            """Start the background maintenance jobs, settings go to Modulation.MaintenanceScheduler"""
+            self.stop_maintenance()
+            self.maintenance = Modulation.MaintenanceScheduler(self, **settings)
+            self.maintenance.start()
+            return self.maintenance
+
+        def stop_maintenance(self):
+            if self.maintenance is not None:
+                self.maintenance.stop()
+                self.maintenance = None
+
+        def close(self):
+            """Stop the background jobs and drop cached results. Connections are per call, none stay open."""
+            self.stop_maintenance()
+            if self.query_cache is not None:
+                self.query_cache.clear()
+
+        def invalidate_tables(self, tables: Iterable[str]):
+            """
+            Report a write made outside execute_dict / insert_dict / transaction_dict: drops cached
+            results depending on tables (plus tables their triggers write) and counts the write burst.
+            """
+            self.write_count += 1
+            self.last_write_at = time.monotonic()
+            if self.query_cache is not None:
+                self.query_cache.invalidate_tables(tables)
+
+        def _watch(self, conn) -> Optional['Modulation.QueryCache.Access']:
+            """Collect the tables conn's statements touch, only while a query cache is enabled"""
+            return Modulation.QueryCache.watch(conn) if self.query_cache is not None else None
+
+        def _after_write(self, access: Optional['Modulation.QueryCache.Access'], writes: int = 1):
+            self.write_count += writes
+            self.last_write_at = time.monotonic()
+            if self.query_cache is not None:
+                self.query_cache.invalidate(access)
+
+        def _record(self, sql: str, parameters, start: float, rows: int):
+            """Report a finished statement to the instrumentation (no-op when disabled)"""
+            if self.instrumentation.enabled:
+                self.instrumentation.record(sql, parameters, time.perf_counter() - start, rows)
+
         def _log_error(self, error: Exception):
-            """Centralized error logging using inspect module"""
-            # Get the current function name
-            current_function = inspect.currentframe().f_back.f_code.co_name
+            """Centralized error logging, reports the calling function's name"""
+            # sys._getframe instead of the inspect module, which costs more to import than this module
+            current_function = sys._getframe(1).f_code.co_name
             print(f"\n⚠️ Error in {current_function}: {str(error)}\n")
 
         def execute_dict(
@@ -50,42 +121,138 @@ class Modulation:
             """
             try:
                 with self._get_connection() as conn:
+                    access = self._watch(conn)
                     cursor = conn.cursor()
+                    start = time.perf_counter()
                     cursor.execute(sql, parameters or {})
                     if commit:
                         conn.commit()
+                    self._record(sql, parameters, start, cursor.rowcount)
+                    self._after_write(access)
                     return cursor.rowcount
             except sqlite3.Error as e:
                 self._log_error(e)
                 return 0
 
-        def fetch_all_dict(
+        def insert_dict(
                 self,
                 sql: str,
                 parameters: Optional[Dict] = None
+        ) -> Optional[int]:
+            """
+            Execute an INSERT with dictionary parameters
+            Returns the inserted row ID (read on the same connection as the insert)
+            """
+            try:
+                with self._get_connection() as conn:
+                    access = self._watch(conn)
+                    cursor = conn.cursor()
+                    start = time.perf_counter()
+                    cursor.execute(sql, parameters or {})
+                    conn.commit()
+                    self._record(sql, parameters, start, cursor.rowcount)
+                    self._after_write(access)
+                    return cursor.lastrowid
+            except sqlite3.Error as e:
+                self._log_error(e)
+                return None
+
+        def fetch_all_dict(
+                self,
+                sql: str,
+                parameters: Optional[Dict] = None,
+                use_cache: bool = True
         ) -> List[Dict]:
-            """Fetch all results as dictionaries"""
+            """Fetch all results as dictionaries (served from the query cache when enabled)"""
+            cache = self.query_cache if use_cache else None
+            if cache is not None:
+                key, cached = cache.lookup(sql, parameters)
+                if cached is not Modulation.QueryCache.MISS:
+                    return [dict(row) for row in cached]
+                generation = cache.generation
             try:
                 with self._get_connection() as conn:
+                    access = cache.watch(conn) if cache is not None and key is not None else None
                     cursor = conn.cursor()
+                    start = time.perf_counter()
                     cursor.execute(sql, parameters or {})
-                    return [dict(row) for row in cursor.fetchall()]
+                    rows = [dict(row) for row in cursor.fetchall()]
+                    self._record(sql, parameters, start, len(rows))
+                    if access is not None:
+                        cache.store(key, access, tuple(dict(row) for row in rows), generation)
+                    return rows
             except sqlite3.Error as e:
                 self._log_error(e)
                 return []
 
+        def fetch_all(
+                self,
+                sql: str,
+                parameters: Optional[Dict] = None,
+                row_mode: str = "dict",
+                batch_size: int = 10000
+        ):
+            """
+            Fetch all results in the chosen row representation:
+                "dict"      list of dicts (same as fetch_all_dict, query cache applies)
+                "tuple"     Modulation.TupleRows: plain tuples sharing one column index
+                "record"    list of namedtuple records, one class per column set (no per-row dict)
+                "columnar"  Modulation.ColumnBatch: one array('q') / array('d') per numeric column,
+                            lists for the others, filled batch_size rows at a time
+            The compact modes skip the query cache and return values exactly as stored.
+            """
+            if row_mode == "dict":
+                return self.fetch_all_dict(sql, parameters)
+            if row_mode not in ("tuple", "record", "columnar"):
+                raise ValueError(f"Unknown row_mode: {row_mode}")
+
+            try:
+                with self._get_connection() as conn:
+                    conn.row_factory = None  # Plain tuples, no sqlite3.Row per row
+                    cursor = conn.cursor()
+                    start = time.perf_counter()
+                    cursor.execute(sql, parameters or {})
+                    columns = tuple(column[0] for column in cursor.description or ())
+                    if row_mode == "columnar":
+                        result = Modulation.ColumnBatch.from_cursor(columns, cursor, batch_size)
+                    else:
+                        rows = cursor.fetchall()
+                        if row_mode == "record":
+                            record = Modulation.record_class(columns)
+                            rows = list(map(record._make, rows))
+                        result = Modulation.TupleRows(columns, rows) if row_mode == "tuple" else rows
+                    self._record(sql, parameters, start, len(result))
+                    return result
+            except sqlite3.Error as e:
+                self._log_error(e)
+                return Modulation.TupleRows((), []) if row_mode == "tuple" else \
+                    Modulation.ColumnBatch((), {}) if row_mode == "columnar" else []
+
         def fetch_one_dict(
                 self,
                 sql: str,
-                parameters: Optional[Dict] = None
+                parameters: Optional[Dict] = None,
+                use_cache: bool = True
         ) -> Optional[Dict]:
-            """Fetch single result as dictionary"""
+            """Fetch single result as dictionary (served from the query cache when enabled)"""
+            cache = self.query_cache if use_cache else None
+            if cache is not None:
+                key, cached = cache.lookup(sql, parameters, one=True)
+                if cached is not Modulation.QueryCache.MISS:
+                    return dict(cached) if cached else None
+                generation = cache.generation
             try:
                 with self._get_connection() as conn:
+                    access = cache.watch(conn) if cache is not None and key is not None else None
                     cursor = conn.cursor()
+                    start = time.perf_counter()
                     cursor.execute(sql, parameters or {})
                     result = cursor.fetchone()
-                    return dict(result) if result else None
+                    self._record(sql, parameters, start, 1 if result else 0)
+                    result = dict(result) if result else None
+                    if access is not None:
+                        cache.store(key, access, dict(result) if result else None, generation)
+                    return result
             except sqlite3.Error as e:
                 self._log_error(e)
                 return None
@@ -97,41 +264,607 @@ class Modulation:
             """
             try:
                 with self._get_connection() as conn:
+                    access = self._watch(conn)
                     cursor = conn.cursor()
                     for sql, params in operations:
+                        start = time.perf_counter()
                         cursor.execute(sql, params or {})
+                        self._record(sql, params, start, cursor.rowcount)
+                    start = time.perf_counter()
                     conn.commit()
+                    self._record("COMMIT", None, start, 0)
+                    self._after_write(access, len(operations))
                     return True
             except sqlite3.Error as e:
                 self._log_error(e)
                 return False
 
+    class QueryInstrumentation:
+        """
+        Low overhead query statistics for SQLiteDatabase.
+
+        Statements are keyed by their normalized SQL (whitespace collapsed, literals replaced by ?) and
+        tracked with a fixed-bucket latency histogram, so p50 / p99 can be read without storing samples.
+        Statements slower than slow_query_ms are kept in a bounded slow-query log with their
+        EXPLAIN QUERY PLAN, and passed to on_slow_query if set.
+        Connection wait is the time spent opening a connection (sqlite3.connect).
+        """
+        # Upper bounds (ms) of the histogram buckets, the last bucket is open-ended.
+        BUCKETS_MS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+        _NO_PLAN = ("PRAGMA", "BEGIN", "COMMIT", "ROLLBACK", "CREATE", "ALTER", "DROP", "VACUUM",
+                    "EXPLAIN", "ATTACH", "DETACH", "ANALYZE", "SAVEPOINT", "RELEASE")
+        _STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+        _NUMBER_LITERAL = re.compile(r"(?<![\w:$@?])-?\d+(?:\.\d+)?\b")
+        _IN_LIST = re.compile(r"\bIN\s*\((?:\s*\?\s*,)*\s*\?\s*\)", re.IGNORECASE)
+        _WHITESPACE = re.compile(r"\s+")
+
+        def __init__(self, db_path: str, enabled: bool = True, slow_query_ms: float = 200.0,
+                     slow_log_size: int = 100, explain_slow_queries: bool = True):
+            self.db_path = db_path
+            self.enabled = enabled
+            self.slow_query_ms = slow_query_ms
+            self.explain_slow_queries = explain_slow_queries
+            self.on_slow_query = None  # optional callable(record: dict)
+            self.slow_queries = deque(maxlen=slow_log_size)
+            self._lock = threading.Lock()
+            self._normalized = {}  # raw SQL -> normalized SQL
+            self.statements = {}
+            self.connection_wait = self._new_stats()
+
+        def enable(self):
+            self.enabled = True
+
+        def disable(self):
+            self.enabled = False
+
+        def reset(self):
+            with self._lock:
+                self.statements = {}
+                self.connection_wait = self._new_stats()
+                self.slow_queries.clear()
+
+        def _new_stats(self) -> Dict:
+            return {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "rows": 0,
+                    "buckets": [0] * (len(self.BUCKETS_MS) + 1)}
+
+        def normalize(self, sql: str) -> str:
+            """Collapse whitespace and replace literals, so equal statements share one entry"""
+            normalized = self._normalized.get(sql)
+            if normalized is None:
+                normalized = self._STRING_LITERAL.sub("?", sql)
+                normalized = self._NUMBER_LITERAL.sub("?", normalized)
+                normalized = self._WHITESPACE.sub(" ", normalized).strip().rstrip(";")
+                normalized = self._IN_LIST.sub("IN (...)", normalized)
+                if len(self._normalized) < 10000:  # Bounded, dynamic SQL must not grow it forever
+                    self._normalized[sql] = normalized
+            return normalized
+
+        def _add(self, stats: Dict, elapsed_ms: float, rows: int):
+            stats["count"] += 1
+            stats["total_ms"] += elapsed_ms
+            stats["rows"] += rows
+            if elapsed_ms > stats["max_ms"]:
+                stats["max_ms"] = elapsed_ms
+            stats["buckets"][bisect_left(self.BUCKETS_MS, elapsed_ms)] += 1
+
+        def record_connection(self, elapsed: float):
+            with self._lock:
+                self._add(self.connection_wait, elapsed * 1000, 0)
+
+        def record(self, sql: str, parameters, elapsed: float, rows: int):
+            """Record one statement execution (elapsed in seconds, rows returned or affected)"""
+            elapsed_ms = elapsed * 1000
+            normalized = self.normalize(sql)
+            rows = max(rows, 0)  # rowcount is -1 for statements without a row count
+            with self._lock:
+                stats = self.statements.get(normalized)
+                if stats is None:
+                    stats = self.statements[normalized] = self._new_stats()
+                self._add(stats, elapsed_ms, rows)
+
+            if elapsed_ms >= self.slow_query_ms:
+                self._log_slow_query(sql, normalized, parameters, elapsed_ms, rows)
+
+        def _log_slow_query(self, sql: str, normalized: str, parameters, elapsed_ms: float, rows: int):
+            record = {
+                "sql": normalized,
+                "ms": round(elapsed_ms, 3),
+                "rows": rows,
+                "at": time.time(),
+                "plan": self.explain(sql, parameters) if self.explain_slow_queries else None,
+            }
+            self.slow_queries.append(record)
+            if self.on_slow_query:
+                self.on_slow_query(record)
+
+        def explain(self, sql: str, parameters=None) -> Optional[List[str]]:
+            """EXPLAIN QUERY PLAN of sql on a separate connection, None for statements without a plan"""
+            if sql.lstrip().upper().startswith(self._NO_PLAN):
+                return None
+            try:
+                conn = sqlite3.connect(self.db_path)
+                try:
+                    return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", parameters or {})]
+                finally:
+                    conn.close()
+            except sqlite3.Error:
+                return None
+
+        def percentile(self, stats: Dict, fraction: float) -> float:
+            """Estimated latency (ms) below which `fraction` of the calls completed (bucket upper bound)"""
+            if not stats["count"]:
+                return 0.0
+            threshold = fraction * stats["count"]
+            seen = 0
+            for bound, hits in zip(self.BUCKETS_MS, stats["buckets"]):
+                seen += hits
+                if seen >= threshold:
+                    return min(bound, stats["max_ms"])
+            return stats["max_ms"]
+
+        def _summary(self, stats: Dict) -> Dict:
+            count = stats["count"]
+            return {
+                "count": count,
+                "rows": stats["rows"],
+                "total_ms": round(stats["total_ms"], 3),
+                "mean_ms": round(stats["total_ms"] / count, 3) if count else 0.0,
+                "p50_ms": self.percentile(stats, 0.50),
+                "p99_ms": self.percentile(stats, 0.99),
+                "max_ms": round(stats["max_ms"], 3),
+                "buckets": list(stats["buckets"]),
+            }
+
+        def snapshot(self) -> Dict:
+            """JSON-serializable view of every statistic collected so far"""
+            with self._lock:
+                return {
+                    "db_path": self.db_path,
+                    "bucket_bounds_ms": list(self.BUCKETS_MS),
+                    "statements": {sql: self._summary(stats) for sql, stats in self.statements.items()},
+                    "connection_wait": self._summary(self.connection_wait),
+                    "slow_queries": list(self.slow_queries),
+                }
+
+        def dump_json(self, path: str):
+            """Write snapshot() to path as JSON (e.g. for charting p50 / p99 latency)"""
+            import json  # Only needed for exports, kept off the startup path
+            with open(path, "w", encoding="utf-8") as file:
+                json.dump(self.snapshot(), file, indent=2)
+
+    class QueryCache:
+        """
+        Size-bounded LRU cache of SELECT results for SQLiteDatabase.
+
+        Entries are keyed by whitespace-normalized SQL plus the frozen parameters. The tables a statement
+        reads and writes are taken from SQLite itself: watch() installs an authorizer on the connection,
+        which reports SQLITE_READ for every real table read (views arrive expanded to their base tables)
+        and SQLITE_INSERT / UPDATE / DELETE for every table written, trigger bodies included. Writes
+        invalidate at table granularity, DDL clears everything. A generation counter keeps a read that
+        raced with a write from storing its (possibly stale) result. Results no write can invalidate are
+        never stored: statements calling a nondeterministic function (SQLITE_FUNCTION, e.g. random() or
+        date('now')) and statements that read no table at all.
+        """
+        MISS = object()
+        _CACHEABLE = re.compile(r"^\s*(SELECT|WITH)\b", re.IGNORECASE)
+        _WHITESPACE = re.compile(r"\s+")
+        _WRITE_ACTIONS = frozenset((sqlite3.SQLITE_INSERT, sqlite3.SQLITE_UPDATE, sqlite3.SQLITE_DELETE))
+        _SCHEMA_ACTIONS = frozenset((
+            sqlite3.SQLITE_CREATE_INDEX, sqlite3.SQLITE_CREATE_TABLE, sqlite3.SQLITE_CREATE_TEMP_INDEX,
+            sqlite3.SQLITE_CREATE_TEMP_TABLE, sqlite3.SQLITE_CREATE_TEMP_TRIGGER, sqlite3.SQLITE_CREATE_TEMP_VIEW,
+            sqlite3.SQLITE_CREATE_TRIGGER, sqlite3.SQLITE_CREATE_VIEW, sqlite3.SQLITE_CREATE_VTABLE,
+            sqlite3.SQLITE_DROP_INDEX, sqlite3.SQLITE_DROP_TABLE, sqlite3.SQLITE_DROP_TEMP_INDEX,
+            sqlite3.SQLITE_DROP_TEMP_TABLE, sqlite3.SQLITE_DROP_TEMP_TRIGGER, sqlite3.SQLITE_DROP_TEMP_VIEW,
+            sqlite3.SQLITE_DROP_TRIGGER, sqlite3.SQLITE_DROP_VIEW, sqlite3.SQLITE_DROP_VTABLE,
+            sqlite3.SQLITE_ALTER_TABLE, sqlite3.SQLITE_ATTACH, sqlite3.SQLITE_DETACH,
+        ))
+        # Functions whose result changes between identical calls
+        _VOLATILE_FUNCTIONS = frozenset((
+            "random", "randomblob", "changes", "total_changes", "last_insert_rowid",
+            "current_date", "current_time", "current_timestamp",
+        ))
+        # Date and time functions, volatile when they read the clock: 'now' or no time value at all
+        _CLOCK_FUNCTIONS = frozenset(("date", "time", "datetime", "julianday", "strftime", "unixepoch"))
+        _NOW = re.compile(r"'now'|\b(date|time|datetime|julianday|unixepoch)\s*\(\s*\)", re.IGNORECASE)
+
+        class Access:
+            """Tables read and written by the statements prepared on one watched connection"""
+            __slots__ = ("read", "written", "schema", "functions")
+
+            def __init__(self):
+                self.read = set()
+                self.written = set()
+                self.schema = False  # DDL, ATTACH / DETACH or a PRAGMA assignment
+                self.functions = set()
+
+        def __init__(self, db: 'Modulation.SQLiteDatabase', max_entries: int = 256):
+            self.db = db
+            self.max_entries = max_entries
+            self.generation = 0
+            self._entries = OrderedDict()  # key -> (tables, result)
+            self._by_table = {}  # table -> set of keys
+            self._triggers = {}  # table -> tables written by its triggers, see invalidate_tables
+            self._lock = threading.Lock()
+            self.hits = self.misses = self.evictions = self.invalidations = self.uncacheable = 0
+
+        @classmethod
+        def watch(cls, conn) -> 'Modulation.QueryCache.Access':
+            """
+            Collect the tables every statement prepared on conn reads and writes. The authorizer runs
+            while a statement is prepared, so it costs nothing per row; it allows everything.
+            """
+            access = cls.Access()
+
+            def authorizer(action, arg1, arg2, db_name, trigger):
+                if action == sqlite3.SQLITE_READ:
+                    if arg1:
+                        access.read.add(arg1.lower())
+                elif action in cls._WRITE_ACTIONS:
+                    access.written.add(arg1.lower())
+                elif action in cls._SCHEMA_ACTIONS or (action == sqlite3.SQLITE_PRAGMA and arg2 is not None):
+                    access.schema = True
+                elif action == sqlite3.SQLITE_FUNCTION:
+                    access.functions.add(arg2.lower())
+                return sqlite3.SQLITE_OK
+
+            conn.set_authorizer(authorizer)
+            return access
+
+        @staticmethod
+        def _freeze(parameters):
+            if not parameters:
+                return ()
+            if isinstance(parameters, dict):
+                return tuple(sorted(parameters.items()))
+            return tuple(parameters)
+
+        def lookup(self, sql: str, parameters=None, one: bool = False):
+            """Returns (key, cached result or MISS). key is None for statements that are not cached."""
+            if not self._CACHEABLE.match(sql):
+                return None, self.MISS
+            try:
+                key = (self._WHITESPACE.sub(" ", sql).strip(), self._freeze(parameters), one)
+                hash(key)
+            except TypeError:
+                return None, self.MISS
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is None:
+                    self.misses += 1
+                    return key, self.MISS
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return key, entry[1]
+
+        def store(self, key, access: 'Modulation.QueryCache.Access', result, generation: int):
+            """Cache result under key, access being what watch() collected while the query ran"""
+            if access.written or access.schema:
+                self.invalidate(access)  # e.g. WITH ... INSERT: a write, never cached
+                return
+            if not access.read or not self._deterministic(key, access):
+                self.uncacheable += 1  # No write would ever invalidate it
+                return
+            tables = frozenset(access.read)
+            with self._lock:
+                if generation != self.generation:
+                    return  # A write landed while the query ran
+                self._entries[key] = (tables, result)
+                self._entries.move_to_end(key)
+                for table in tables:
+                    self._by_table.setdefault(table, set()).add(key)
+                while len(self._entries) > self.max_entries:
+                    old_key, (old_tables, _) = self._entries.popitem(last=False)
+                    self._forget(old_key, old_tables)
+                    self.evictions += 1
+
+        def _deterministic(self, key, access: 'Modulation.QueryCache.Access') -> bool:
+            """False when the statement of key called a function whose result differs from call to call"""
+            if access.functions & self._VOLATILE_FUNCTIONS:
+                return False
+            if access.functions & self._CLOCK_FUNCTIONS:
+                sql, parameters, _ = key
+                values = (item[1] if isinstance(item, tuple) else item for item in parameters)
+                if self._NOW.search(sql) or any(isinstance(value, str) and value.strip().lower() == "now"
+                                                for value in values):
+                    return False
+            return True
+
+        def _forget(self, key, tables):
+            for table in tables:
+                keys = self._by_table.get(table)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self._by_table[table]
+
+        def invalidate(self, access: Optional['Modulation.QueryCache.Access']):
+            """Invalidate after write statements, access from watch() (None when unknown: clears everything)"""
+            if access is None or access.schema:
+                self.clear(schema_changed=True)
+            elif access.written:
+                self._drop_tables(access.written)
+
+        def invalidate_tables(self, tables: Iterable[str]):
+            """
+            Invalidate after writes made on a connection that was not watched. The tables written by
+            triggers of tables are included, found by preparing an INSERT / UPDATE / DELETE on each
+            table under the authorizer (EXPLAIN, nothing is executed).
+            """
+            pending = [table.lower() for table in tables]
+            affected = set()
+            while pending:  # Follow trigger chains (a trigger writing a table with its own triggers)
+                table = pending.pop()
+                if table not in affected:
+                    affected.add(table)
+                    pending.extend(self._trigger_targets(table))
+            self._drop_tables(affected)
+
+        def _drop_tables(self, tables: Iterable[str]):
+            with self._lock:
+                self.generation += 1
+                self.invalidations += 1
+                for table in tables:
+                    for key in self._by_table.pop(table, set()):
+                        entry = self._entries.pop(key, None)
+                        if entry is not None:
+                            self._forget(key, entry[0])
+
+        def clear(self, schema_changed: bool = False):
+            with self._lock:
+                self.generation += 1
+                self.invalidations += 1
+                self._entries.clear()
+                self._by_table.clear()
+                if schema_changed:
+                    self._triggers = {}
+
+        def _trigger_targets(self, table: str) -> frozenset:
+            """Tables written by the triggers of table, read once per schema"""
+            targets = self._triggers.get(table)
+            if targets is None:
+                targets = set()
+                try:
+                    with self.db._get_connection() as conn:
+                        columns = [row[1] for row in conn.execute(f'PRAGMA table_info("{table}")')]
+                        if columns:
+                            access = self.watch(conn)
+                            assignments = ", ".join(f'"{column}" = "{column}"' for column in columns)
+                            for sql in (f'EXPLAIN INSERT INTO "{table}" DEFAULT VALUES',
+                                        f'EXPLAIN UPDATE "{table}" SET {assignments}',
+                                        f'EXPLAIN DELETE FROM "{table}"'):
+                                conn.execute(sql)
+                            targets = access.written - {table}
+                except sqlite3.Error as e:
+                    self.db._log_error(e)
+                targets = self._triggers[table] = frozenset(targets)
+            return targets
+
+        def stats(self) -> Dict:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "uncacheable": self.uncacheable,
+            }
+
+    _record_classes = {}
+
+    @staticmethod
+    def record_class(columns: Tuple[str, ...]):
+        """namedtuple class for a column set, generated once per schema / select list"""
+        record = Modulation._record_classes.get(columns)
+        if record is None:
+            record = namedtuple("Record", columns, rename=True)
+            Modulation._record_classes[columns] = record
+        return record
+
+    class TupleRows:
+        """Rows as plain tuples with one shared column-name index"""
+        __slots__ = ("columns", "index", "rows")
+
+        def __init__(self, columns: Tuple[str, ...], rows: List[tuple]):
+            self.columns = columns
+            self.index = {name: position for position, name in enumerate(columns)}
+            self.rows = rows
+
+        def __len__(self):
+            return len(self.rows)
+
+        def __iter__(self):
+            return iter(self.rows)
+
+        def __getitem__(self, position):
+            return self.rows[position]
+
+        def get(self, position: int, column: str):
+            return self.rows[position][self.index[column]]
+
+        def column(self, name: str) -> list:
+            position = self.index[name]
+            return [row[position] for row in self.rows]
+
+        def as_dicts(self) -> List[Dict]:
+            return [dict(zip(self.columns, row)) for row in self.rows]
+
+    class ColumnBatch:
+        """
+        Column-oriented result: integer columns in array('q'), float columns in array('d') and any
+        column holding NULLs, text or blobs in a plain list.
+        """
+        __slots__ = ("columns", "data", "length")
+
+        def __init__(self, columns: Tuple[str, ...], data: Dict, length: int = 0):
+            self.columns = columns
+            self.data = data
+            self.length = length
+
+        @classmethod
+        def from_cursor(cls, columns: Tuple[str, ...], cursor, batch_size: int = 10000) -> 'Modulation.ColumnBatch':
+            store = [array("q") for _ in columns]
+            length = 0
+            while True:
+                batch = cursor.fetchmany(batch_size)
+                if not batch:
+                    break
+                length += len(batch)
+                for position, values in enumerate(zip(*batch)):
+                    store[position] = cls._extend(store[position], values)
+            return cls(columns, dict(zip(columns, store)), length)
+
+        @staticmethod
+        def _extend(data, values):
+            """Append values, demoting the column q -> d -> list when they no longer fit"""
+            while isinstance(data, array):
+                try:
+                    data.extend(array(data.typecode, values))
+                    return data
+                except (TypeError, OverflowError):
+                    if (data.typecode == "q" and any(type(value) is float for value in values)
+                            and all(type(value) in (int, float) for value in values)):
+                        data = array("d", data)
+                    else:
+                        data = list(data)
+            data.extend(values)
+            return data
+
+        def __len__(self):
+            return self.length
+
+        def column(self, name: str):
+            return self.data[name]
+
+        def row(self, position: int) -> tuple:
+            return tuple(self.data[name][position] for name in self.columns)
+
+        def __iter__(self):
+            return zip(*(self.data[name] for name in self.columns))
+
+    class Money:
+        """
+        Money stored as integer minor units (e.g. cents) with a per-currency scale.
+
+        Values are converted at the CRUDOperations boundary, so the database only ever holds INTEGERs
+        and SQL aggregates (SUM, GROUP BY) stay exact without rounding on read.
+        """
+        CURRENCY_SCALES = {
+            "USD": 2, "EUR": 2, "GBP": 2, "INR": 2, "PKR": 2, "AED": 2, "SAR": 2,
+            "JPY": 0, "KRW": 0,
+            "KWD": 3, "BHD": 3, "OMR": 3,
+        }
+        DEFAULT_SCALE = 2
+
+        @classmethod
+        def scale_of(cls, currency: str) -> int:
+            """Number of minor-unit digits of a currency"""
+            return cls.CURRENCY_SCALES.get(currency.upper(), cls.DEFAULT_SCALE)
+
+        @classmethod
+        def to_minor(cls, value, currency: str = "USD") -> Optional[int]:
+            """Convert a major-unit amount (int, float, str or Decimal) to integer minor units"""
+            if value is None:
+                return None
+            scale = cls.scale_of(currency)
+            if isinstance(value, int) and not isinstance(value, bool):
+                return value * 10 ** scale
+            from decimal import Decimal, ROUND_HALF_UP  # Kept off the startup path
+            # repr() gives the shortest decimal that round-trips, so 1.005 rounds like "1.005" does.
+            text = repr(value) if isinstance(value, float) else str(value)
+            return int(Decimal(text).scaleb(scale).to_integral_value(rounding=ROUND_HALF_UP))
+
+        @classmethod
+        def from_minor(cls, minor: Optional[int], currency: str = "USD") -> Union[int, float, None]:
+            """Convert integer minor units back to a major-unit amount"""
+            if minor is None:
+                return None
+            scale = cls.scale_of(currency)
+            return minor if scale == 0 else minor / 10 ** scale
+
     class CRUDOperations:
         """Generic CRUD operations using dictionary input/output"""
 
-        def __init__(self, db: 'Modulation.SQLiteDatabase'):
+        def __init__(
+                self,
+                db: 'Modulation.SQLiteDatabase',
+                money_columns: Optional[Dict[str, Iterable[str]]] = None,
+                currency: str = "USD"
+        ):
+            """
+            money_columns maps table names to the columns holding money. Those columns are stored as
+            integer minor units of currency: values are converted on the way in and back on read.
+            """
             self.db = db
+            self.currency = currency
+            self.money_columns = {table: frozenset(cols) for table, cols in (money_columns or {}).items()}
+
+        def query_stats(self) -> Dict:
+            """Query statistics of the underlying database, every CRUD call is recorded there"""
+            return self.db.instrumentation.snapshot()
+
+        def _to_storage(self, table: str, data: Optional[Dict]) -> Optional[Dict]:
+            """Convert the money values of data to minor units"""
+            columns = self.money_columns.get(table)
+            if not columns or not data:
+                return data
+            return {
+                k: Modulation.Money.to_minor(v, self.currency) if k in columns else v
+                for k, v in data.items()
+            }
+
+        def _from_storage(self, table: str, rows: List[Dict]) -> List[Dict]:
+            """Convert the minor-unit money values of rows back to major units (in place)"""
+            columns = self.money_columns.get(table)
+            if not columns or not rows:
+                return rows
+            present = [k for k in rows[0] if k in columns]
+            for row in rows:
+                for k in present:
+                    row[k] = Modulation.Money.from_minor(row[k], self.currency)
+            return rows
+
+        def _select_list(self, table: str) -> str:
+            """Columns of table with money columns converted to major units, same values as _from_storage"""
+            columns = self.money_columns.get(table)
+            scale = Modulation.Money.scale_of(self.currency)
+            if not columns or scale == 0:
+                return "*"
+            names = [row["name"] for row in
+                     self.db.fetch_all_dict(f"PRAGMA table_info({table})", use_cache=False)]
+            return ", ".join(f"{name} / {10 ** scale}.0 AS {name}" if name in columns else name
+                             for name in names) or "*"
 
         def create(self, table: str, data: Dict) -> int:
             """Insert new record, returns inserted row ID"""
+            data = self._to_storage(table, data)
             columns = ", ".join(data.keys())
             placeholders = ", ".join(f":{k}" for k in data.keys())
             sql = f"INSERT INTO {table} ({columns}) VALUES ({placeholders})"
-            self.db.execute_dict(sql, data)
-            return self.db.fetch_one_dict("SELECT last_insert_rowid() AS id")['id']
+            return self.db.insert_dict(sql, data)
 
-        def read(self, table: str, filters: Optional[Dict] = None) -> List[Dict]:
-            """Read records with optional filters"""
-            sql = f"SELECT * FROM {table}"
+        def read(self, table: str, filters: Optional[Dict] = None, row_mode: str = "dict"):
+            """
+            Read records with optional filters.
+            row_mode selects the row representation (see SQLiteDatabase.fetch_all). Every mode returns
+            money columns in major units, the compact modes have SQLite divide them in the select list.
+            """
+            sql = f"SELECT {self._select_list(table) if row_mode != 'dict' else '*'} FROM {table}"
             params = {}
             if filters:
                 where_clause = " AND ".join(f"{k} = :{k}" for k in filters.keys())
                 sql += f" WHERE {where_clause}"
-                params = filters
-            return self.db.fetch_all_dict(sql, params)
+                params = self._to_storage(table, filters)
+            if row_mode != "dict":
+                return self.db.fetch_all(sql, params, row_mode)
+            return self._from_storage(table, self.db.fetch_all_dict(sql, params))
 
         def update(self, table: str, updates: Dict, conditions: Dict) -> int:
             """Update records, returns number of affected rows"""
+            updates = self._to_storage(table, updates)
+            conditions = self._to_storage(table, conditions)
             set_clause = ", ".join(f"{k} = :{k}" for k in updates.keys())
             where_clause = " AND ".join(f"{k} = :cond_{k}" for k in conditions.keys())
 
@@ -144,6 +877,7 @@ class Modulation:
 
         def delete(self, table: str, conditions: Dict) -> int:
             """Delete records, returns number of affected rows"""
+            conditions = self._to_storage(table, conditions)
             where_clause = " AND ".join(f"{k} = :{k}" for k in conditions.keys())
             sql = f"DELETE FROM {table} WHERE {where_clause}"
             return self.db.execute_dict(sql, conditions)
@@ -157,3 +891,787 @@ class Modulation:
             schema = self.get_table_schema(table)
             pk = [col['name'] for col in schema if col['pk'] > 0]
             return pk[0] if len(pk) == 1 else pk
+
+        def money_array(self, table: str, column: str, filters: Optional[Dict] = None) -> array:
+            """
+            Fetch a money column as a typed array('q') of minor units in one pass.
+            NULLs are skipped. Suitable for vectorized totals / bucketing over large tables.
+            """
+            sql = f"SELECT {column} FROM {table} WHERE {column} IS NOT NULL"
+            params = {}
+            if filters:
+                sql += " AND " + " AND ".join(f"{k} = :{k}" for k in filters.keys())
+                params = self._to_storage(table, filters)
+            try:
+                with self.db._get_connection() as conn:
+                    conn.row_factory = None  # Plain tuples, flattened in C by chain.from_iterable
+                    return array("q", chain.from_iterable(conn.execute(sql, params)))
+            except sqlite3.Error as e:
+                self.db._log_error(e)
+                return array("q")
+
+        def sum_money(
+                self,
+                table: str,
+                column: str,
+                filters: Optional[Dict] = None,
+                group_by: Optional[str] = None,
+                as_minor: bool = False
+        ) -> Union[int, float, Dict]:
+            """
+            Exact total of a money column, computed by SQLite over the integer minor units.
+            With group_by returns {group value: total}. Totals are in major units unless as_minor.
+            """
+            select = f"SUM({column}) AS total"
+            if group_by:
+                select = f"{group_by} AS grp, " + select
+            sql = f"SELECT {select} FROM {table}"
+            params = {}
+            if filters:
+                sql += " WHERE " + " AND ".join(f"{k} = :{k}" for k in filters.keys())
+                params = self._to_storage(table, filters)
+            if group_by:
+                sql += f" GROUP BY {group_by}"
+
+            convert = (lambda v: v or 0) if as_minor else \
+                (lambda v: Modulation.Money.from_minor(v or 0, self.currency))
+            rows = self.db.fetch_all_dict(sql, params)
+            if group_by:
+                return {row["grp"]: convert(row["total"]) for row in rows}
+            return convert(rows[0]["total"] if rows else 0)
+
+    class Backfill:
+        """
+        Data backfill run by the Migrator in rowid-ordered chunks.
+
+        Each chunk is its own short write transaction covering at most batch_size rowids, and the last
+        processed rowid is persisted with it, so a crashed backfill resumes where it stopped.
+        Rows inserted after the backfill started are expected to be written in the new shape by the app.
+        """
+
+        def __init__(
+                self,
+                table: str,
+                set_clause: str,
+                where: str = "1",
+                batch_size: int = 1000,
+                functions: Optional[Dict[str, Callable]] = None
+        ):
+            """
+            table: rowid table to backfill
+            set_clause: SQL after SET, e.g. "vendor_key = lower(vendor_name)"
+            where: optional predicate restricting the rows updated inside each chunk
+            functions: Python functions the set clause calls, registered as deterministic SQL functions
+                on the migration connection, e.g. {"to_minor": Modulation.Money.to_minor}
+            """
+            self.table = table
+            self.set_clause = set_clause
+            self.where = where
+            self.batch_size = batch_size
+            self.functions = dict(functions or {})
+
+    class Migration:
+        """One schema version: DDL statements applied atomically, followed by optional backfills"""
+
+        def __init__(
+                self,
+                version: int,
+                description: str,
+                statements: Iterable[str] = (),
+                backfills: Iterable['Modulation.Backfill'] = ()
+        ):
+            self.version = version
+            self.description = description
+            self.statements = list(statements)
+            self.backfills = list(backfills)
+
+    class Migrator:
+        """
+        Versioned schema migrations tracked through PRAGMA user_version.
+
+        For every pending migration:
+            1. its statements run in one IMMEDIATE transaction, together with a marker row in the
+               progress table (so DDL is never applied twice),
+            2. each backfill runs in resumable chunks, one short transaction per chunk,
+            3. user_version is bumped and the progress rows are removed in a final transaction.
+
+        When the database is already at the target version migrate() only reads user_version. Pending
+        migrations without backfills, or whose backfill tables are still empty, are applied together in
+        a single transaction, so bootstrapping an empty database costs one commit.
+        """
+        PROGRESS_TABLE = "_migration_progress"
+        SCHEMA_STEP = -1  # progress row marking that a migration's statements were applied
+
+        def __init__(
+                self,
+                db: 'Modulation.SQLiteDatabase',
+                migrations: Iterable['Modulation.Migration'],
+                progress=None,
+                pause: float = 0.0
+        ):
+            """
+            progress: optional callable(migration, backfill_index, last_rowid, max_rowid, rows_updated)
+                      called after every committed backfill chunk
+            pause: seconds to sleep between chunks, giving other writers a window on the write lock
+            """
+            self.db = db
+            self.migrations = sorted(migrations, key=lambda m: m.version)
+            self.progress = progress
+            self.pause = pause
+
+        @property
+        def latest_version(self) -> int:
+            return self.migrations[-1].version if self.migrations else 0
+
+        def current_version(self) -> int:
+            result = self.db.fetch_one_dict("PRAGMA user_version")
+            return result["user_version"] if result else 0
+
+        def pending(self) -> List['Modulation.Migration']:
+            current = self.current_version()
+            return [m for m in self.migrations if m.version > current]
+
+        def migrate(self, target: Optional[int] = None) -> int:
+            """Apply (or resume) every pending migration up to target, returns the resulting version"""
+            target = self.latest_version if target is None else target
+            conn = self.db._get_connection()
+            conn.isolation_level = None  # Explicit transaction control below
+            try:
+                version = conn.execute("PRAGMA user_version").fetchone()[0]
+                pending = [m for m in self.migrations if version < m.version <= target]
+                if not pending:
+                    return version  # Fast path: nothing to do, nothing written
+                blocked = None  # Backfill migration _apply_batch found rows for, run it in chunks instead
+                while pending:
+                    batch = []
+                    for migration in pending:
+                        if migration.backfills and (migration is blocked or
+                                                    not self._nothing_to_backfill(conn, migration)):
+                            break
+                        batch.append(migration)
+                    if batch:
+                        version = self._apply_batch(conn, batch)
+                        pending = [m for m in pending if m.version > version]
+                        blocked = pending[0] if pending and pending[0] in batch else None
+                    else:
+                        migration = pending.pop(0)
+                        if self._apply_schema(conn, migration):
+                            for index, backfill in enumerate(migration.backfills):
+                                self._run_backfill(conn, migration, index, backfill)
+                            self._finish(conn, migration)
+                        version = max(version, migration.version)
+                    if self.db.query_cache is not None:
+                        self.db.query_cache.clear(schema_changed=True)
+                return version
+            except sqlite3.Error as e:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                self.db._log_error(e)
+                return conn.execute("PRAGMA user_version").fetchone()[0]
+            finally:
+                conn.close()
+
+        def _apply_batch(self, conn, migrations: List['Modulation.Migration']) -> int:
+            """Apply consecutive migrations without backfills and bump user_version in one transaction"""
+            conn.execute("BEGIN IMMEDIATE")
+            self._create_progress_table(conn)
+            # Re-read under the write lock, another process may have migrated since the first check.
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            for migration in migrations:
+                if migration.version <= version:
+                    continue
+                if migration.backfills and not self._nothing_to_backfill(conn, migration):
+                    break  # Rows appeared since the first check, migrate() backfills them in chunks
+                applied = conn.execute(
+                    f"SELECT 1 FROM {self.PROGRESS_TABLE} WHERE version = ? AND step = ?",
+                    (migration.version, self.SCHEMA_STEP)
+                ).fetchone()
+                if not applied:
+                    for statement in migration.statements:
+                        conn.execute(statement)
+                conn.execute(f"DELETE FROM {self.PROGRESS_TABLE} WHERE version = ?", (migration.version,))
+                version = migration.version
+            conn.execute(f"PRAGMA user_version = {int(version)}")
+            conn.execute("COMMIT")
+            return version
+
+        @staticmethod
+        def _nothing_to_backfill(conn, migration: 'Modulation.Migration') -> bool:
+            """True when every backfill table is empty (or not created yet), so the DDL alone suffices"""
+            for backfill in migration.backfills:
+                try:
+                    if conn.execute(f"SELECT EXISTS (SELECT 1 FROM {backfill.table})").fetchone()[0]:
+                        return False
+                except sqlite3.OperationalError:
+                    continue  # Created by an earlier migration of the same batch, empty
+            return True
+
+        def _create_progress_table(self, conn):
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.PROGRESS_TABLE} ("
+                "version INTEGER, step INTEGER, last_rowid INTEGER DEFAULT 0, "
+                "PRIMARY KEY (version, step))"
+            )
+
+        def _applied_elsewhere(self, conn, migration: 'Modulation.Migration') -> bool:
+            """Inside a write transaction: True when another connection already finished migration"""
+            return conn.execute("PRAGMA user_version").fetchone()[0] >= migration.version
+
+        def _apply_schema(self, conn, migration: 'Modulation.Migration') -> bool:
+            """Apply the DDL once, returns False when another process already finished the migration"""
+            conn.execute("BEGIN IMMEDIATE")
+            if self._applied_elsewhere(conn, migration):
+                conn.execute("COMMIT")
+                return False
+            self._create_progress_table(conn)
+            applied = conn.execute(
+                f"SELECT 1 FROM {self.PROGRESS_TABLE} WHERE version = ? AND step = ?",
+                (migration.version, self.SCHEMA_STEP)
+            ).fetchone()
+            if not applied:
+                for statement in migration.statements:
+                    conn.execute(statement)
+                conn.executemany(
+                    f"INSERT INTO {self.PROGRESS_TABLE} (version, step) VALUES (?, ?)",
+                    [(migration.version, step) for step in range(self.SCHEMA_STEP, len(migration.backfills))]
+                )
+            conn.execute("COMMIT")
+            return True
+
+        def _run_backfill(self, conn, migration: 'Modulation.Migration', index: int,
+                          backfill: 'Modulation.Backfill'):
+            key = (migration.version, index)
+            for name, function in backfill.functions.items():
+                conn.create_function(name, -1, function, deterministic=True)
+            max_rowid = conn.execute(f"SELECT MAX(rowid) FROM {backfill.table}").fetchone()[0] or 0
+
+            while True:
+                conn.execute("BEGIN IMMEDIATE")
+                # Re-read the position under the write lock: another process may be running the same
+                # backfill (its chunks must not be applied twice) or may have finished the migration.
+                row = conn.execute(
+                    f"SELECT last_rowid FROM {self.PROGRESS_TABLE} WHERE version = ? AND step = ?", key
+                ).fetchone()
+                if row is None or row[0] >= max_rowid:
+                    conn.execute("COMMIT")
+                    break
+                last_rowid = row[0]
+                upper = conn.execute(
+                    f"SELECT MAX(rowid) FROM (SELECT rowid FROM {backfill.table} "
+                    "WHERE rowid > ? ORDER BY rowid LIMIT ?)",
+                    (last_rowid, backfill.batch_size)
+                ).fetchone()[0]
+                if upper is None:
+                    conn.execute("COMMIT")
+                    break
+                updated = conn.execute(
+                    f"UPDATE {backfill.table} SET {backfill.set_clause} "
+                    f"WHERE rowid > ? AND rowid <= ? AND ({backfill.where})",
+                    (last_rowid, upper)
+                ).rowcount
+                conn.execute(
+                    f"UPDATE {self.PROGRESS_TABLE} SET last_rowid = ? WHERE version = ? AND step = ?",
+                    (upper, *key)
+                )
+                conn.execute("COMMIT")
+                last_rowid = upper
+
+                if self.progress:
+                    self.progress(migration, index, last_rowid, max_rowid, updated)
+                if self.pause:
+                    time.sleep(self.pause)
+
+        def _finish(self, conn, migration: 'Modulation.Migration'):
+            conn.execute("BEGIN IMMEDIATE")
+            if not self._applied_elsewhere(conn, migration):
+                conn.execute(f"PRAGMA user_version = {int(migration.version)}")
+            conn.execute(f"DELETE FROM {self.PROGRESS_TABLE} WHERE version = ?", (migration.version,))
+            conn.execute("COMMIT")
+
+    class BackupManager:
+        """
+        Online backups of a live database, safe while WAL writers are active.
+
+            backup()       sqlite3 online backup API in page steps, sleeping between steps so writers
+                           are never starved of the lock. The copy restarts if another connection
+                           writes mid-way, so the result is always a consistent image. After
+                           max_restarts restarts it falls back to snapshot(), which a steady writer
+                           cannot keep restarting.
+            snapshot()     single-step backup: one read transaction, which in WAL mode does not block
+                           writers, giving a point-in-time copy.
+            vacuum_into()  VACUUM INTO a compacted, defragmented copy.
+
+        Every copy is written to "<dest>.part", checked with PRAGMA integrity_check (unless verify is
+        False) and only then renamed to dest. Each call returns a report with size, time and MB/s.
+        """
+
+        class _TooManyRestarts(Exception):
+            """Raised from the backup progress callback to abandon a copy that keeps restarting"""
+
+        def __init__(self, db: 'Modulation.SQLiteDatabase'):
+            self.db = db
+
+        def backup(
+                self,
+                dest_path: str,
+                pages_per_step: int = 1024,
+                sleep: float = 0.005,
+                progress=None,
+                verify: bool = True,
+                max_restarts: Optional[int] = 3
+        ) -> Dict:
+            """
+            Incremental online backup.
+            progress: optional callable(copied_pages, total_pages) after every step
+            max_restarts: restarts caused by concurrent writers before falling back to snapshot()
+                          (None retries forever). The report then has mode "snapshot" and
+                          fallback_from "backup" plus the restarts seen.
+            """
+            state = {"steps": 0, "restarts": 0, "remaining": None, "pages": 0}
+
+            def on_step(status, remaining, total):
+                if state["remaining"] is not None and remaining > state["remaining"]:
+                    state["restarts"] += 1  # Source changed by another connection, SQLite started over
+                    if max_restarts is not None and state["restarts"] > max_restarts:
+                        raise Modulation.BackupManager._TooManyRestarts()
+                state["steps"] += 1
+                state["remaining"] = remaining
+                state["pages"] = total
+                if progress:
+                    progress(total - remaining, total)
+
+            try:
+                report = self._copy(
+                    dest_path,
+                    lambda src, dst: src.backup(dst, pages=pages_per_step, progress=on_step, sleep=sleep),
+                    verify
+                )
+            except Modulation.BackupManager._TooManyRestarts:
+                print(f"\n⚠️ Backup of {self.db.db_path} restarted {state['restarts']} times by concurrent "
+                      f"writes, falling back to a snapshot\n")
+                report = self.snapshot(dest_path, verify)
+                report.update(fallback_from="backup", pages=state["pages"], steps=state["steps"],
+                              restarts=state["restarts"])
+                return report
+            report.update(mode="backup", pages=state["pages"], steps=state["steps"], restarts=state["restarts"])
+            return report
+
+        def snapshot(self, dest_path: str, verify: bool = True) -> Dict:
+            """Consistent point-in-time copy in a single backup step"""
+            report = self._copy(dest_path, lambda src, dst: src.backup(dst, pages=-1), verify)
+            report["mode"] = "snapshot"
+            return report
+
+        def vacuum_into(self, dest_path: str, verify: bool = True) -> Dict:
+            """Compacted copy through VACUUM INTO (also drops free pages and defragments indexes)"""
+            def vacuum(src, _):
+                src.execute("VACUUM INTO ?", (dest_path + ".part",))
+
+            report = self._copy(dest_path, vacuum, verify, open_dest=False)
+            report["mode"] = "vacuum_into"
+            return report
+
+        def timestamped_backup(self, directory: str, keep: Optional[int] = 7, mode: str = "backup") -> Dict:
+            """
+            Nightly style backup into directory as "<name>-YYYYmmdd-HHMMSS.db" using mode
+            ("backup", "snapshot" or "vacuum_into"), keeping only the newest `keep` copies.
+            """
+            os.makedirs(directory, exist_ok=True)
+            stem = os.path.splitext(os.path.basename(self.db.db_path))[0]
+            dest = os.path.join(directory, f"{stem}-{time.strftime('%Y%m%d-%H%M%S')}.db")
+            report = getattr(self, mode)(dest)
+
+            if keep is not None and report["ok"]:
+                pattern = re.compile(rf"^{re.escape(stem)}-\d{{8}}-\d{{6}}\.db$")
+                copies = sorted(name for name in os.listdir(directory) if pattern.match(name))
+                for name in copies[:-keep] if keep else copies:
+                    os.remove(os.path.join(directory, name))
+            return report
+
+        @staticmethod
+        def verify(path: str, quick: bool = False) -> Tuple[bool, List[str]]:
+            """Run PRAGMA integrity_check (or quick_check) on path, returns (ok, messages)"""
+            pragma = "quick_check" if quick else "integrity_check"
+            conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+            try:
+                messages = [row[0] for row in conn.execute(f"PRAGMA {pragma}")]
+            finally:
+                conn.close()
+            return messages == ["ok"], messages
+
+        def _copy(self, dest_path: str, copy, verify: bool, open_dest: bool = True) -> Dict:
+            part = dest_path + ".part"
+            for leftover in (part, part + "-wal", part + "-shm"):
+                if os.path.exists(leftover):
+                    os.remove(leftover)
+
+            report = {"path": dest_path, "ok": False, "integrity": None}
+            start = time.perf_counter()
+            try:
+                src = sqlite3.connect(self.db.db_path)
+                dst = sqlite3.connect(part) if open_dest else None
+                try:
+                    copy(src, dst)
+                finally:
+                    if dst is not None:
+                        dst.close()
+                    src.close()
+                # Backups are standalone single files, no -wal / -shm next to them.
+                dst = sqlite3.connect(part)
+                try:
+                    dst.execute("PRAGMA journal_mode = DELETE")
+                finally:
+                    dst.close()
+                elapsed = time.perf_counter() - start
+                size = os.path.getsize(part)
+                report.update(bytes=size, seconds=round(elapsed, 4),
+                              mb_per_s=round(size / (1024 * 1024) / elapsed, 2) if elapsed else None)
+
+                if verify:
+                    verify_start = time.perf_counter()
+                    ok, messages = self.verify(part)
+                    report.update(integrity=messages[:10], verify_seconds=round(time.perf_counter() - verify_start, 4))
+                    if not ok:
+                        return report
+                os.replace(part, dest_path)
+                report["ok"] = True
+            except (sqlite3.Error, OSError) as e:
+                self.db._log_error(e)
+                report["error"] = str(e)
+            return report
+
+    class MaintenanceScheduler:
+        """
+        Background maintenance owned by a SQLiteDatabase (see SQLiteDatabase.start_maintenance).
+
+        Every `interval` seconds the scheduler thread runs whichever jobs are due:
+            checkpoint          PRAGMA wal_checkpoint(PASSIVE) once the -wal file passes wal_checkpoint_bytes,
+                                TRUNCATE once it passes wal_truncate_bytes (resets the file size)
+            optimize            ANALYZE when the planner has no statistics yet, PRAGMA optimize otherwise,
+                                after optimize_after_writes writes since the last run
+            incremental_vacuum  PRAGMA incremental_vacuum(vacuum_pages) after idle_seconds without writes,
+                                when the database uses auto_vacuum = INCREMENTAL and has free pages
+        Each job is timed and kept in `history`; run_pending() runs one round synchronously.
+        """
+
+        def __init__(
+                self,
+                db: 'Modulation.SQLiteDatabase',
+                interval: float = 30.0,
+                wal_checkpoint_bytes: int = 64 * 1024 * 1024,
+                wal_truncate_bytes: int = 256 * 1024 * 1024,
+                optimize_after_writes: int = 5000,
+                idle_seconds: float = 300.0,
+                vacuum_pages: int = 1000,
+                history_size: int = 200,
+                verbose: bool = True
+        ):
+            self.db = db
+            self.interval = interval
+            self.wal_checkpoint_bytes = wal_checkpoint_bytes
+            self.wal_truncate_bytes = wal_truncate_bytes
+            self.optimize_after_writes = optimize_after_writes
+            self.idle_seconds = idle_seconds
+            self.vacuum_pages = vacuum_pages
+            self.verbose = verbose
+            self.history = deque(maxlen=history_size)
+            self._writes_at_optimize = db.write_count
+            self._vacuumed_after_write = None  # last_write_at value the last vacuum ran for
+            self._stop = threading.Event()
+            self._thread = None
+
+        def start(self):
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="sqlite-maintenance", daemon=True)
+            self._thread.start()
+
+        def stop(self, timeout: Optional[float] = 5.0):
+            self._stop.set()
+            if self._thread is not None:
+                self._thread.join(timeout)
+                self._thread = None
+
+        def _run(self):
+            while not self._stop.wait(self.interval):
+                self.run_pending()
+
+        def wal_size(self) -> int:
+            try:
+                return os.path.getsize(self.db.db_path + "-wal")
+            except OSError:
+                return 0
+
+        def run_pending(self) -> List[Dict]:
+            """Run every job that is due now, returns their history records"""
+            records = []
+            wal_size = self.wal_size()
+            if wal_size >= self.wal_truncate_bytes:
+                records.append(self.checkpoint("TRUNCATE"))
+            elif wal_size >= self.wal_checkpoint_bytes:
+                records.append(self.checkpoint("PASSIVE"))
+
+            if self.db.write_count - self._writes_at_optimize >= self.optimize_after_writes:
+                records.append(self.optimize())
+
+            last_write = self.db.last_write_at
+            if (time.monotonic() - last_write >= self.idle_seconds
+                    and self._vacuumed_after_write != last_write):
+                self._vacuumed_after_write = last_write
+                record = self.incremental_vacuum()
+                if record is not None:
+                    records.append(record)
+            return [record for record in records if record is not None]
+
+        def checkpoint(self, mode: str = "PASSIVE") -> Optional[Dict]:
+            """Checkpoint the WAL, result is (busy, wal frames, checkpointed frames)"""
+            mode = mode.upper()
+            if mode not in ("PASSIVE", "FULL", "RESTART", "TRUNCATE"):
+                raise ValueError(f"Unknown checkpoint mode: {mode}")
+            wal_before = self.wal_size()
+
+            def job(conn):
+                busy, frames, checkpointed = conn.execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+                return {"busy": busy, "wal_frames": frames, "checkpointed": checkpointed,
+                        "wal_bytes_before": wal_before, "wal_bytes_after": self.wal_size()}
+
+            return self._timed(f"checkpoint_{mode.lower()}", job)
+
+        def optimize(self) -> Optional[Dict]:
+            """ANALYZE on a database without statistics, PRAGMA optimize afterwards"""
+            self._writes_at_optimize = self.db.write_count
+
+            def job(conn):
+                has_stats = conn.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'"
+                ).fetchone()
+                conn.execute("PRAGMA optimize" if has_stats else "ANALYZE")
+                return {"statement": "PRAGMA optimize" if has_stats else "ANALYZE"}
+
+            # Statistics can change plans, not data: cached results stay valid.
+            return self._timed("optimize", job)
+
+        def incremental_vacuum(self, pages: Optional[int] = None) -> Optional[Dict]:
+            """Release up to `pages` free pages, None when auto_vacuum is not INCREMENTAL or nothing is free"""
+            pages = self.vacuum_pages if pages is None else pages
+            conn = self.db._get_connection()
+            try:
+                auto_vacuum = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+                free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            finally:
+                conn.close()
+            if auto_vacuum != 2 or not free_pages:
+                return None
+
+            def job(conn):
+                conn.execute(f"PRAGMA incremental_vacuum({int(pages)})").fetchall()
+                remaining = conn.execute("PRAGMA freelist_count").fetchone()[0]
+                return {"freed_pages": free_pages - remaining, "free_pages_left": remaining}
+
+            return self._timed("incremental_vacuum", job)
+
+        def enable_incremental_vacuum(self) -> Optional[Dict]:
+            """
+            Switch the database to auto_vacuum = INCREMENTAL. This needs a full VACUUM, which rewrites
+            the whole file under an exclusive lock: run it in a maintenance window, not from the scheduler.
+            """
+            def job(conn):
+                conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                conn.execute("VACUUM")
+                return {"auto_vacuum": conn.execute("PRAGMA auto_vacuum").fetchone()[0]}
+
+            return self._timed("enable_incremental_vacuum", job)
+
+        def _timed(self, name: str, job) -> Optional[Dict]:
+            record = {"job": name, "started": time.time()}
+            start = time.perf_counter()
+            try:
+                conn = self.db._get_connection()
+                conn.isolation_level = None  # Maintenance pragmas must not run inside a transaction
+                try:
+                    record["result"] = job(conn)
+                finally:
+                    conn.close()
+            except sqlite3.Error as e:
+                self.db._log_error(e)
+                record["error"] = str(e)
+            record["seconds"] = round(time.perf_counter() - start, 4)
+            self.history.append(record)
+            if self.verbose:
+                print(f"[maintenance] {name} {record.get('result', record.get('error'))} "
+                      f"in {record['seconds'] * 1000:.1f} ms")
+            return record
+
+    class ChangeFeed:
+        """
+        Change-data capture: triggers append one compact row per written row to a journal,
+            change_feed(seq, table_name, op, row_id, changed_at)
+        seq is AUTOINCREMENT, so it only ever grows (also across prunes), op is 'I', 'U' or 'D' and
+        row_id the key of the written row, its INTEGER PRIMARY KEY or the natural key given to
+        schema_statements (fetch the row itself from its table when needed).
+
+        Downstream consumers keep a cursor in change_feed_consumers instead of polling whole tables:
+            pull(consumer)  changes after the consumer's acknowledged seq, in seq order
+            ack(consumer)   move the cursor forward once a batch is processed (at-least-once delivery)
+            tail(consumer)  generator of batches that acknowledges each batch when the next is requested
+            prune()         delete changes every registered consumer has acknowledged
+        The journal only records changes made after it was installed: take a full copy once, then
+        register() the consumer, which starts it at the current end of the feed.
+        """
+        FEED_TABLE = "change_feed"
+        CONSUMER_TABLE = "change_feed_consumers"
+        _OPS = (("INSERT", "I", "NEW"), ("UPDATE", "U", "NEW"), ("DELETE", "D", "OLD"))
+
+        def __init__(self, db: 'Modulation.SQLiteDatabase'):
+            self.db = db
+
+        @classmethod
+        def schema_statements(cls, tables: Dict[str, str]) -> List[str]:
+            """
+            DDL of the journal, the cursor table and the AFTER INSERT / UPDATE / DELETE triggers,
+            tables: {table: row key column}. Use the INTEGER PRIMARY KEY or a natural key, never "rowid":
+            VACUUM may renumber the rowids of a table without an INTEGER PRIMARY KEY.
+            """
+            statements = [
+                f"""
+                CREATE TABLE IF NOT EXISTS {cls.FEED_TABLE}(
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    table_name TEXT NOT NULL,
+                    op TEXT NOT NULL,
+                    row_id INTEGER,
+                    changed_at INTEGER NOT NULL DEFAULT (CAST(strftime('%s', 'now') AS INTEGER))
+                )
+                """,
+                f"""
+                CREATE TABLE IF NOT EXISTS {cls.CONSUMER_TABLE}(
+                    consumer TEXT PRIMARY KEY,
+                    acked_seq INTEGER NOT NULL DEFAULT 0,
+                    acked_at INTEGER
+                )
+                """,
+            ]
+            for table, key in tables.items():
+                for event, op, ref in cls._OPS:
+                    statements.append(
+                        f"CREATE TRIGGER IF NOT EXISTS trg_{table}_{event.lower()}_feed "
+                        f"AFTER {event} ON {table} BEGIN "
+                        f"INSERT INTO {cls.FEED_TABLE} (table_name, op, row_id) "
+                        f"VALUES ('{table}', '{op}', {ref}.{key}); END"
+                    )
+            return statements
+
+        def last_seq(self) -> int:
+            """Highest seq handed out so far (0 for an empty journal)"""
+            row = self.db.fetch_one_dict("SELECT seq FROM sqlite_sequence WHERE name = :name",
+                                         {"name": self.FEED_TABLE}, use_cache=False)
+            return row["seq"] if row else 0
+
+        def read(self, since: int = 0, limit: int = 500, tables: Optional[Iterable[str]] = None) -> List[Dict]:
+            """Up to limit changes with seq > since, in seq order, optionally only for some tables"""
+            sql = f"SELECT seq, table_name, op, row_id, changed_at FROM {self.FEED_TABLE} WHERE seq > :since"
+            parameters = {"since": since, "limit": limit}
+            if tables is not None:
+                names = list(tables)
+                sql += f" AND table_name IN ({', '.join(f':t{i}' for i in range(len(names)))})"
+                parameters.update({f"t{i}": name for i, name in enumerate(names)})
+            # The journal changes with every write, caching it would only churn the query cache.
+            return self.db.fetch_all_dict(sql + " ORDER BY seq LIMIT :limit", parameters, use_cache=False)
+
+        def register(self, consumer: str, from_start: bool = False) -> int:
+            """Create the consumer's cursor (at the current end of the feed unless from_start), returns it"""
+            self.db.execute_dict(
+                f"INSERT OR IGNORE INTO {self.CONSUMER_TABLE} (consumer, acked_seq, acked_at) "
+                "SELECT :consumer, CASE WHEN :from_start THEN 0 ELSE COALESCE("
+                "(SELECT seq FROM sqlite_sequence WHERE name = :feed), 0) END, "
+                "CAST(strftime('%s', 'now') AS INTEGER)",
+                {"consumer": consumer, "from_start": from_start, "feed": self.FEED_TABLE}
+            )
+            return self.cursor(consumer)
+
+        def unregister(self, consumer: str) -> bool:
+            """Drop a consumer, so it no longer holds back prune()"""
+            return self.db.execute_dict(f"DELETE FROM {self.CONSUMER_TABLE} WHERE consumer = :consumer",
+                                        {"consumer": consumer}) > 0
+
+        def cursor(self, consumer: str) -> int:
+            """Last seq acknowledged by consumer (0 for an unknown consumer)"""
+            row = self.db.fetch_one_dict(
+                f"SELECT acked_seq FROM {self.CONSUMER_TABLE} WHERE consumer = :consumer",
+                {"consumer": consumer}, use_cache=False
+            )
+            return row["acked_seq"] if row else 0
+
+        def consumers(self) -> List[Dict]:
+            return self.db.fetch_all_dict(f"SELECT * FROM {self.CONSUMER_TABLE} ORDER BY consumer",
+                                          use_cache=False)
+
+        def pull(self, consumer: str, limit: int = 500, tables: Optional[Iterable[str]] = None) -> List[Dict]:
+            """Next changes after consumer's cursor, the cursor is not moved until ack()"""
+            return self.read(self.cursor(consumer), limit, tables)
+
+        def ack(self, consumer: str, seq: int) -> int:
+            """Acknowledge every change up to seq, the cursor never moves backwards. Returns the cursor."""
+            self.db.execute_dict(
+                f"INSERT INTO {self.CONSUMER_TABLE} (consumer, acked_seq, acked_at) "
+                "VALUES (:consumer, :seq, CAST(strftime('%s', 'now') AS INTEGER)) "
+                "ON CONFLICT(consumer) DO UPDATE SET acked_seq = MAX(acked_seq, excluded.acked_seq), "
+                "acked_at = excluded.acked_at",
+                {"consumer": consumer, "seq": seq}
+            )
+            return self.cursor(consumer)
+
+        def tail(
+                self,
+                consumer: str,
+                batch_size: int = 500,
+                poll_interval: Optional[float] = None,
+                idle_timeout: Optional[float] = None,
+                tables: Optional[Iterable[str]] = None
+        ):
+            """
+            Yield batches of changes after consumer's cursor. A batch is acknowledged when the next one
+            is requested, so a consumer that crashes mid-batch sees that batch again on restart.
+            With poll_interval None the generator stops once the feed is drained, otherwise it sleeps
+            poll_interval seconds between empty reads until idle_timeout seconds pass without changes
+            (forever when idle_timeout is None).
+            """
+            tables = list(tables) if tables is not None else None
+            position = self.cursor(consumer)
+            idle_since = time.monotonic()
+            while True:
+                batch = self.read(position, batch_size, tables)
+                if batch:
+                    yield batch
+                    position = batch[-1]["seq"]
+                    self.ack(consumer, position)
+                    idle_since = time.monotonic()
+                    continue
+                if poll_interval is None or (
+                        idle_timeout is not None and time.monotonic() - idle_since >= idle_timeout):
+                    return
+                time.sleep(poll_interval)
+
+        def prune(self, chunk_size: int = 10000) -> int:
+            """
+            Delete changes acknowledged by every registered consumer, in chunks of chunk_size seqs so
+            writers are never locked out for long. Nothing is deleted while no consumer is registered.
+            Returns the number of deleted changes.
+            """
+            row = self.db.fetch_one_dict(
+                f"SELECT MIN(acked_seq) AS upto, "
+                f"(SELECT MIN(seq) FROM {self.FEED_TABLE}) AS first FROM {self.CONSUMER_TABLE}",
+                use_cache=False
+            )
+            if not row or row["upto"] is None or row["first"] is None:
+                return 0
+            deleted = 0
+            low = row["first"] - 1
+            while low < row["upto"]:
+                high = min(low + chunk_size, row["upto"])
+                deleted += self.db.execute_dict(
+                    f"DELETE FROM {self.FEED_TABLE} WHERE seq > :low AND seq <= :high",
+                    {"low": low, "high": high}
+                )
+                low = high
+            return deleted
@@ -0,0 +1,189 @@
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from datetime import date, timedelta
+from typing import Optional, List, Dict, Callable, Iterable
+
+from db.Modulated_Database_Constructor import Modulation
+
+# Read-only connection of the current worker process, opened once by _init_worker.
+_worker_conn = None
+
+
+def _init_worker(db_path: str):
+    global _worker_conn
+    _worker_conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    _worker_conn.row_factory = sqlite3.Row
+    _worker_conn.execute("PRAGMA query_only = ON")
+
+
+def _run_partition(worker: Callable, index: int, partition, options: Dict):
+    return index, worker(_worker_conn, partition, **options)
+
+
+def _money(minor, currency: str) -> str:
+    scale = Modulation.Money.scale_of(currency)
+    return f"{Modulation.Money.from_minor(minor or 0, currency):,.{scale}f}"
+
+
+def vendor_statements(conn: sqlite3.Connection, vendors: List[str], currency: str = "USD") -> List[str]:
+    """
+    Worker: formatted account statement of every vendor in the partition, one string per vendor
+    (invoices with their credits, debits, payments and outstanding, then the notes).
+    """
+    placeholders = ", ".join("?" for _ in vendors)
+    invoices = {}
+    for row in conn.execute(
+            f"""
+            SELECT invoices.vendor_name, invoices.ID, invoices.invoice_number, invoices.date,
+                   invoices.due_date, invoices.price, outstanding_table.total_credits,
+                   outstanding_table.total_debits, outstanding_table.payment, outstanding_table.outstanding
+            FROM invoices
+            LEFT JOIN outstanding_table ON outstanding_table.invoice_id = invoices.ID
+            WHERE invoices.vendor_name IN ({placeholders})
+            ORDER BY invoices.date, invoices.ID
+            """,
+            vendors
+    ):
+        invoices.setdefault(row["vendor_name"], []).append(row)
+
+    notes = {}
+    for row in conn.execute(
+            f"""
+            SELECT invoices.vendor_name, invoices.invoice_number, credits_debits_notes.note_number,
+                   credits_debits_notes.note_type, credits_debits_notes.price, credits_debits_notes.reason
+            FROM credits_debits_notes
+            JOIN invoices ON invoices.ID = credits_debits_notes.invoice_id
+            WHERE invoices.vendor_name IN ({placeholders})
+            ORDER BY credits_debits_notes.ID
+            """,
+            vendors
+    ):
+        notes.setdefault(row["vendor_name"], []).append(row)
+
+    statements = []
+    for vendor in vendors:
+        lines = [f"STATEMENT OF ACCOUNT - {vendor}", "=" * 96,
+                 f"{'Invoice':<16}{'Date':<12}{'Due':<12}{'Amount':>14}{'Credits':>14}"
+                 f"{'Debits':>14}{'Outstanding':>14}"]
+        total = 0
+        for row in invoices.get(vendor, []):
+            total += row["outstanding"] or 0
+            lines.append(
+                f"{row['invoice_number'] or '':<16}{row['date'] or '':<12}{row['due_date'] or '':<12}"
+                f"{_money(row['price'], currency):>14}{_money(row['total_credits'], currency):>14}"
+                f"{_money(row['total_debits'], currency):>14}{_money(row['outstanding'], currency):>14}"
+            )
+        for row in notes.get(vendor, []):
+            lines.append(f"  {row['note_type'] or 'Note'} {row['note_number'] or ''} on {row['invoice_number']}: "
+                         f"{_money(row['price'], currency)} {row['reason'] or ''}".rstrip())
+        lines.append(f"{'Total outstanding':<82}{_money(total, currency):>14}")
+        statements.append("\n".join(lines) + "\n")
+    return statements
+
+
+def due_reports(conn: sqlite3.Connection, date_range: tuple, currency: str = "USD") -> List[str]:
+    """Worker: one line per invoice with an outstanding balance due within date_range (inclusive)"""
+    start, end = date_range
+    return [
+        f"{row['due_date']}  {row['invoice_number'] or '':<16}{row['vendor_name'] or '':<32}"
+        f"{_money(row['outstanding'], currency):>14}\n"
+        for row in conn.execute(
+            """
+            SELECT outstanding_table.due_date, invoices.invoice_number, invoices.vendor_name,
+                   outstanding_table.outstanding
+            FROM outstanding_table
+            JOIN invoices ON invoices.ID = outstanding_table.invoice_id
+            WHERE outstanding_table.due_date BETWEEN ? AND ? AND outstanding_table.outstanding > 0
+            ORDER BY outstanding_table.due_date, invoices.ID
+            """,
+            (start, end)
+        )
+    ]
+
+
+class ReportRunner:
+    """
+    Splits a report into partitions (vendor groups or date ranges) and formats them in a process pool.
+
+    Every worker process holds its own read-only connection. Finished partitions may complete out of
+    order, they are buffered and handed to the writer strictly in partition order, and at most
+    2 x processes partitions are in flight so memory stays bounded on very large jobs.
+    """
+
+    def __init__(self, db_path: str, processes: Optional[int] = None, currency: str = "USD"):
+        self.db_path = db_path
+        self.processes = processes
+        self.currency = currency
+
+    def vendor_partitions(self, vendors_per_partition: int = 50) -> List[List[str]]:
+        conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+        try:
+            vendors = [row[0] for row in conn.execute(
+                "SELECT DISTINCT vendor_name FROM invoices WHERE vendor_name IS NOT NULL ORDER BY vendor_name"
+            )]
+        finally:
+            conn.close()
+        return [vendors[i:i + vendors_per_partition] for i in range(0, len(vendors), vendors_per_partition)]
+
+    @staticmethod
+    def date_partitions(start: date, end: date, days: int = 7) -> List[tuple]:
+        """Inclusive ISO date ranges of `days` days covering start..end"""
+        ranges = []
+        while start <= end:
+            stop = min(start + timedelta(days=days - 1), end)
+            ranges.append((start.isoformat(), stop.isoformat()))
+            start = stop + timedelta(days=1)
+        return ranges
+
+    def run(
+            self,
+            worker: Callable,
+            partitions: Iterable,
+            writer: Callable[[str], object],
+            progress: Optional[Callable[[int, int], object]] = None
+    ) -> Dict:
+        """
+        Run worker(conn, partition, currency=...) for every partition and pass each returned item to
+        writer in partition order. progress(done, total) is called as partitions complete.
+        Returns {"partitions", "items"}.
+        """
+        partitions = list(partitions)
+        options = {"currency": self.currency}
+        pending, buffered = set(), {}
+        next_to_write = items = done = 0
+        submitted = iter(enumerate(partitions))
+
+        workers = self.processes or os.cpu_count() or 1
+        in_flight = 2 * workers
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(self.db_path,)) as pool:
+
+            def submit_more():
+                for index, partition in submitted:
+                    pending.add(pool.submit(_run_partition, worker, index, partition, options))
+                    if len(pending) >= in_flight:
+                        break
+
+            submit_more()
+            while pending:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    pending.discard(future)
+                    index, result = future.result()
+                    buffered[index] = result
+                    done += 1
+                    if progress:
+                        progress(done, len(partitions))
+                while next_to_write in buffered:
+                    for item in buffered.pop(next_to_write):
+                        writer(item)
+                        items += 1
+                    next_to_write += 1
+                submit_more()
+
+        return {"partitions": len(partitions), "items": items}
+
+    def vendor_statements_to_file(self, path: str, vendors_per_partition: int = 50, progress=None) -> Dict:
+        """Write every vendor's statement to path, vendors in alphabetical order"""
+        with open(path, "w", encoding="utf-8") as file:
+            return self.run(vendor_statements, self.vendor_partitions(vendors_per_partition), file.write, progress)
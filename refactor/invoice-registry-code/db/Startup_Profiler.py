@@ -0,0 +1,134 @@
+"""
+Startup profiling: how long the registry spends importing modules and initializing before it is usable.
+
+Usage (from refactor/invoice-registry-code):
+    python -m db.Startup_Profiler                          # imports, cold bootstrap and warm open
+    python -m db.Startup_Profiler --gui                    # also PyQt5, the GUI modules and the first window
+    python -m db.Startup_Profiler --json startup.json
+
+    REGISTRY_PROFILE_STARTUP=1 python app.py               # report the phases of a real run at exit
+
+The command line mode runs in a fresh interpreter, so every import it times is a cold import. Its scratch
+database lives in a new temporary directory that is removed afterwards, no existing file is touched.
+For a per-module breakdown of one import, `python -X importtime -c "import db.Inv_DB"` complements it.
+"""
+
+import atexit
+import os
+import shutil
+import sys
+import time
+from contextlib import contextmanager
+from typing import Optional, List, Dict
+
+ENV_VAR = "REGISTRY_PROFILE_STARTUP"
+
+
+class StartupProfiler:
+    """Records timed import and initialization phases, a no-op while disabled"""
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.started = time.perf_counter()
+        self.records = []  # [(kind, name, seconds)]
+
+    @contextmanager
+    def phase(self, name: str, kind: str = "init"):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.records.append((kind, name, time.perf_counter() - start))
+
+    def import_module(self, name: str):
+        """Import name (timed when it was not imported yet), returns the module"""
+        import importlib
+
+        cached = name in sys.modules
+        with self.phase(name + (" (already imported)" if cached else ""), "import"):
+            return importlib.import_module(name)
+
+    def as_dict(self) -> Dict:
+        return {
+            "total_ms": round((time.perf_counter() - self.started) * 1000, 3),
+            "phases": [{"kind": kind, "name": name, "ms": round(seconds * 1000, 3)}
+                       for kind, name, seconds in self.records],
+        }
+
+    def report(self) -> str:
+        lines = ["Startup profile:"]
+        for kind, name, seconds in self.records:
+            lines.append(f"  {kind:<7} {name:<48} {seconds * 1000:9.2f} ms")
+        lines.append(f"  {'total':<7} {'(since profiler start)':<48} "
+                     f"{(time.perf_counter() - self.started) * 1000:9.2f} ms")
+        return "\n".join(lines)
+
+
+# Shared instance, enabled through REGISTRY_PROFILE_STARTUP=1. TableMaker reports its phases here.
+profiler = StartupProfiler(os.environ.get(ENV_VAR) == "1")
+if profiler.enabled:
+    atexit.register(lambda: print(profiler.report(), file=sys.stderr))
+
+
+def profile_database(run: StartupProfiler, directory: str):
+    """Time the imports and two TableMaker opens of a scratch database created inside directory"""
+    run.import_module("sqlite3")
+    run.import_module("db.Modulated_Database_Constructor")
+    table_maker = run.import_module("db.Inv_DB").TableMaker
+    db_path = os.path.join(directory, "startup_profile.db")
+    with run.phase("TableMaker, new database (schema bootstrap)"):
+        table_maker(db_path)
+    with run.phase("TableMaker, existing database (version check)"):
+        table_maker(db_path)
+
+
+def profile_gui(run: StartupProfiler):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "GUI-Base")))
+    widgets = run.import_module("PyQt5.QtWidgets")
+    window_module = run.import_module("_GUI_COMPONENT_with_themes_ver4")
+    with run.phase("QApplication"):
+        app = widgets.QApplication.instance() or widgets.QApplication(sys.argv)
+    with run.phase("MainWindow"):
+        window = window_module.MainWindow(screen_name="Startup profile")
+    with run.phase("first show and event loop pass"):
+        window.show()
+        app.processEvents()
+    with run.phase("theme load (first current_theme_dict access)"):
+        window.current_theme_dict
+    window.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Registry startup profiler")
+    parser.add_argument("--gui", action="store_true", help="also profile PyQt5 and the first window")
+    parser.add_argument("--json", help="write the phases to this JSON file")
+    args = parser.parse_args(argv)
+
+    import tempfile
+
+    run = StartupProfiler(enabled=True)
+    directory = tempfile.mkdtemp(prefix="registry_startup_")
+    try:
+        profile_database(run, directory)
+        if args.gui:
+            profile_gui(run)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    print(run.report())
+
+    if args.json:
+        import json
+
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(run.as_dict(), file, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
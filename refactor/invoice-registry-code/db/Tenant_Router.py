@@ -0,0 +1,160 @@
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, List, Dict, Iterable, Callable
+
+from db.Modulated_Database_Constructor import Modulation
+from db.Inv_DB import TableMaker
+
+
+class TenantRouter:
+    """
+    Routes every company / branch (tenant) to its own registry file, so writers of different tenants
+    never contend for the same SQLite lock.
+
+    Handles (TableMaker by default) are opened lazily on first use, kept in an LRU of at most max_open
+    entries and closed when evicted or idle for idle_seconds. Cross-tenant reports fan out over a
+    thread pool (sqlite3 releases the GIL while a query runs) and merge the per-tenant results.
+
+    This is a cache of handles, not a connection pool: like every SQLiteDatabase, a handle opens a
+    short-lived connection per call and keeps none open. What the LRU bounds is the per-tenant state a
+    handle carries (schema check done, query cache, maintenance thread), and close() releases exactly
+    that. Open connections are bounded by the callers instead, at most max_workers during a fan-out.
+    """
+    _TENANT_KEY = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]*$")
+    EXTENSION = ".db"
+
+    def __init__(
+            self,
+            base_dir: str,
+            factory: Callable = TableMaker,
+            max_open: int = 16,
+            idle_seconds: float = 600.0,
+            max_workers: Optional[int] = None,
+            **factory_kwargs
+    ):
+        self.base_dir = base_dir
+        self.factory = factory
+        self.factory_kwargs = factory_kwargs
+        self.max_open = max_open
+        self.idle_seconds = idle_seconds
+        self.max_workers = max_workers or min(8, (os.cpu_count() or 1) + 4)
+        self._handles = OrderedDict()  # tenant -> [handle, last used (monotonic)]
+        self._lock = threading.Lock()
+        os.makedirs(base_dir, exist_ok=True)
+
+    def path_for(self, tenant: str) -> str:
+        """Database file of a tenant, rejecting keys that could escape base_dir"""
+        if not isinstance(tenant, str) or not self._TENANT_KEY.match(tenant) or ".." in tenant:
+            raise ValueError(f"Invalid tenant key: {tenant!r}")
+        return os.path.join(self.base_dir, tenant + self.EXTENSION)
+
+    def tenants(self) -> List[str]:
+        """Every tenant with a database file in base_dir"""
+        return sorted(
+            name[:-len(self.EXTENSION)] for name in os.listdir(self.base_dir)
+            if name.endswith(self.EXTENSION) and self._TENANT_KEY.match(name[:-len(self.EXTENSION)])
+        )
+
+    def get(self, tenant: str):
+        """Handle of tenant, creating its database and running the schema check on first use"""
+        path = self.path_for(tenant)
+        with self._lock:
+            entry = self._handles.get(tenant)
+            if entry is not None:
+                entry[1] = time.monotonic()
+                self._handles.move_to_end(tenant)
+                return entry[0]
+
+        # Opened outside the lock: schema bootstrap of one tenant must not block the others.
+        handle = self.factory(path, **self.factory_kwargs)
+        evicted = []
+        with self._lock:
+            entry = self._handles.get(tenant)
+            if entry is not None:  # Another thread opened it meanwhile
+                evicted.append(handle)
+                handle = entry[0]
+            else:
+                self._handles[tenant] = [handle, time.monotonic()]
+            self._handles.move_to_end(tenant)
+            while len(self._handles) > self.max_open:
+                _, (old_handle, _) = self._handles.popitem(last=False)
+                evicted.append(old_handle)
+        for old_handle in evicted:
+            old_handle.close()
+        return handle
+
+    def open_tenants(self) -> List[str]:
+        with self._lock:
+            return list(self._handles)
+
+    def close_idle(self) -> List[str]:
+        """Close (stop the jobs and drop the caches of) handles unused for idle_seconds, returns their tenants"""
+        cutoff = time.monotonic() - self.idle_seconds
+        with self._lock:
+            idle = [tenant for tenant, (_, used) in self._handles.items() if used <= cutoff]
+            handles = [self._handles.pop(tenant)[0] for tenant in idle]
+        for handle in handles:
+            handle.close()
+        return idle
+
+    def close(self, tenant: Optional[str] = None):
+        """Close one tenant's handle, or every open handle"""
+        with self._lock:
+            if tenant is None:
+                handles = [handle for handle, _ in self._handles.values()]
+                self._handles.clear()
+            else:
+                entry = self._handles.pop(tenant, None)
+                handles = [entry[0]] if entry else []
+        for handle in handles:
+            handle.close()
+
+    def map_tenants(self, func: Callable, tenants: Optional[Iterable[str]] = None) -> Dict:
+        """
+        Run func(handle) for every tenant in parallel, returns {tenant: result}.
+        A tenant whose call raised maps to the exception instead of a result.
+        """
+        from concurrent.futures import ThreadPoolExecutor  # Imported on first fan-out, not at startup
+
+        tenants = self.tenants() if tenants is None else list(tenants)
+        self.close_idle()
+        results = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {tenant: pool.submit(lambda t=tenant: func(self.get(t))) for tenant in tenants}
+            for tenant, future in futures.items():
+                try:
+                    results[tenant] = future.result()
+                except Exception as e:
+                    results[tenant] = e
+        return results
+
+    def query_all(self, sql: str, parameters: Optional[Dict] = None,
+                  tenants: Optional[Iterable[str]] = None) -> List[Dict]:
+        """Run one SELECT on every tenant, returns the merged rows tagged with their "tenant" """
+        merged = []
+        per_tenant = self.map_tenants(lambda handle: handle.fetch_all_dict(sql, parameters), tenants)
+        for tenant, rows in per_tenant.items():
+            if isinstance(rows, Exception):
+                raise rows
+            for row in rows:
+                row["tenant"] = tenant
+            merged.extend(rows)
+        return merged
+
+    def total_outstanding(self, tenants: Optional[Iterable[str]] = None) -> Dict:
+        """Outstanding balance per tenant and across all of them, summed exactly in minor units"""
+        per_tenant = self.map_tenants(
+            lambda handle: handle.sum_money("outstanding_table", "outstanding", as_minor=True), tenants
+        )
+        for tenant, total in per_tenant.items():
+            if isinstance(total, Exception):
+                raise total
+        currency = self.factory_kwargs.get("currency", "USD")
+        return {
+            "total": Modulation.Money.from_minor(sum(per_tenant.values()), currency),
+            "per_tenant": {tenant: Modulation.Money.from_minor(total, currency)
+                           for tenant, total in per_tenant.items()},
+        }
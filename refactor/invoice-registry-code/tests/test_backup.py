@@ -0,0 +1,69 @@
+import unittest
+import os, sys
+import shutil
+import sqlite3
+import tempfile
+from db.Modulated_Database_Constructor import Modulation
+from db.Inv_DB import TableMaker
+
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+class TestBackupManager(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.db = TableMaker(os.path.join(self.directory, "registry.db"))
+        self.db.transaction_dict([
+            ("INSERT INTO logs (username, event) VALUES (:u, :e)", {"u": f"user{i}", "e": "x" * 200})
+            for i in range(2000)
+        ])
+        self.manager = Modulation.BackupManager(self.db)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def count_logs(self, path):
+        conn = sqlite3.connect(path)
+        try:
+            return conn.execute("SELECT COUNT(*) FROM logs").fetchone()[0]
+        finally:
+            conn.close()
+
+    def test_backup_snapshot_and_vacuum(self):
+        steps = []
+        for mode, kwargs in (("backup", {"pages_per_step": 16, "sleep": 0, "progress": lambda c, t: steps.append(c)}),
+                             ("snapshot", {}), ("vacuum_into", {})):
+            dest = os.path.join(self.directory, f"{mode}.db")
+            report = getattr(self.manager, mode)(dest, **kwargs)
+            self.assertTrue(report["ok"], report)
+            self.assertEqual(report["integrity"], ["ok"])
+            self.assertGreater(report["bytes"], 0)
+            self.assertEqual(self.count_logs(dest), 2000)
+            self.assertFalse(os.path.exists(dest + ".part"))
+        self.assertGreater(len(steps), 1)
+
+    def test_busy_writer_falls_back_to_snapshot(self):
+        dest = os.path.join(self.directory, "busy.db")
+
+        def write_every_step(copied, total):  # Each write on another connection restarts the copy
+            self.db.create("logs", {"username": "writer", "event": "busy"})
+
+        report = self.manager.backup(dest, pages_per_step=8, sleep=0, progress=write_every_step, max_restarts=2)
+        self.assertTrue(report["ok"], report)
+        self.assertEqual((report["mode"], report["fallback_from"], report["restarts"]), ("snapshot", "backup", 3))
+        self.assertGreaterEqual(self.count_logs(dest), 2000)
+
+    def test_timestamped_backup_rotation(self):
+        backups = os.path.join(self.directory, "nightly")
+        os.makedirs(backups)
+        for day in range(1, 4):
+            open(os.path.join(backups, f"registry-2025010{day}-000000.db"), "w").close()
+        report = self.manager.timestamped_backup(backups, keep=2, mode="snapshot")
+        self.assertTrue(report["ok"])
+        self.assertEqual(sorted(os.listdir(backups)),
+                         ["registry-20250103-000000.db", os.path.basename(report["path"])])
+
+
+if __name__ == "__main__":
+    unittest.main()
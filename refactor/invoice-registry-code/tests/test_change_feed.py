@@ -0,0 +1,77 @@
+import unittest
+import os, sys
+from db.Inv_DB import TableMaker
+
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+TEST_DB = os.path.join(os.path.dirname(__file__), "test_change_feed.db")
+
+
+class TestChangeFeed(unittest.TestCase):
+    def setUp(self):
+        self.db = TableMaker(TEST_DB)
+        self.feed = self.db.change_feed
+
+    def tearDown(self):
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(TEST_DB + suffix):
+                os.remove(TEST_DB + suffix)
+
+    def test_triggers_journal_writes(self):
+        invoice_id = self.db.create("invoices", {"invoice_number": "A-1", "price": 10})
+        self.db.create("outstanding_table", {"invoice_id": invoice_id, "initial_price": 10, "payment": 0,
+                                             "outstanding": 10})
+        self.db.update("invoices", {"price": 12}, {"ID": invoice_id})
+        self.db.create_note({"invoice_id": invoice_id, "note_number": "N-1", "note_type": "Credit", "price": 2})
+        self.db.create("logs", {"username": "u", "event": "not journaled"})
+        self.db.delete("invoices", {"ID": invoice_id})
+
+        changes = [(c["table_name"], c["op"], c["row_id"]) for c in self.feed.read()]
+        self.assertEqual(changes, [
+            ("invoices", "I", invoice_id), ("outstanding_table", "I", 1), ("invoices", "U", invoice_id),
+            ("credits_debits_notes", "I", 1), ("outstanding_table", "U", 1), ("invoices", "D", invoice_id),
+        ])
+        seqs = [c["seq"] for c in self.feed.read()]
+        self.assertEqual(seqs, sorted(seqs))
+        self.assertEqual(self.feed.last_seq(), seqs[-1])
+        self.assertEqual([c["op"] for c in self.feed.read(tables=["invoices"])], ["I", "U", "D"])
+
+    def test_outstanding_events_carry_the_invoice_id(self):
+        self.db.create("invoices", {"invoice_number": "A-1", "price": 10})
+        invoice_id = self.db.create("invoices", {"invoice_number": "A-2", "price": 20})
+        self.db.create("outstanding_table", {"invoice_id": invoice_id, "initial_price": 20, "payment": 0,
+                                             "outstanding": 20})  # rowid 1, invoice 2
+        self.db.delete("outstanding_table", {"invoice_id": invoice_id})
+
+        changes = [(c["op"], c["row_id"]) for c in self.feed.read(tables=["outstanding_table"])]
+        self.assertEqual(changes, [("I", invoice_id), ("D", invoice_id)])
+
+    def test_consumer_cursor_tail_and_prune(self):
+        self.db.create("roles", {"username": "before"})
+        self.assertEqual(self.feed.register("accounting"), 1)  # starts at the current end of the feed
+        self.feed.register("audit", from_start=True)
+        for i in range(5):
+            self.db.create("roles", {"username": f"user{i}"})
+
+        self.assertEqual(len(self.feed.pull("accounting", limit=10)), 5)
+        self.assertEqual(len(self.feed.pull("accounting", limit=10)), 5)  # not acked yet
+
+        batches = [[c["row_id"] for c in batch] for batch in self.feed.tail("accounting", batch_size=2)]
+        self.assertEqual(batches, [[2, 3], [4, 5], [6]])
+        self.assertEqual(self.feed.cursor("accounting"), 6)
+        self.assertEqual(self.feed.ack("accounting", 3), 6)  # never moves backwards
+
+        self.assertEqual(self.feed.prune(chunk_size=2), 0)  # "audit" has not acknowledged anything
+        self.feed.ack("audit", 4)
+        self.assertEqual(self.feed.prune(chunk_size=2), 4)
+        self.assertTrue(self.feed.unregister("audit"))
+        self.assertEqual(self.feed.prune(), 2)
+        self.assertEqual(self.feed.read(), [])
+
+        self.db.create("roles", {"username": "after prune"})
+        self.assertEqual([c["seq"] for c in self.feed.pull("accounting")], [7])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+import os, sys
+import json
+from db.Modulated_Database_Constructor import Modulation
+
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+TEST_DB = os.path.join(os.path.dirname(__file__), "test_instrumentation.db")
+
+
+class TestQueryInstrumentation(unittest.TestCase):
+    def setUp(self):
+        self.db = Modulation.SQLiteDatabase(TEST_DB)
+        self.db.execute_dict("CREATE TABLE invoices (ID INTEGER PRIMARY KEY, vendor TEXT, price INTEGER)")
+        self.crud = Modulation.CRUDOperations(self.db)
+        self.db.instrumentation.reset()
+
+    def tearDown(self):
+        for suffix in ("", "-wal", "-shm", ".json"):
+            if os.path.exists(TEST_DB + suffix):
+                os.remove(TEST_DB + suffix)
+
+    def test_statements_grouped_by_normalized_sql(self):
+        for i in range(5):
+            self.crud.create("invoices", {"vendor": f"V{i}", "price": i})
+        self.db.fetch_all_dict("SELECT * FROM invoices WHERE price > 1")
+        self.db.fetch_all_dict("SELECT *   FROM invoices\n WHERE price > 3")
+
+        stats = self.crud.query_stats()
+        insert = stats["statements"]["INSERT INTO invoices (vendor, price) VALUES (:vendor, :price)"]
+        self.assertEqual((insert["count"], insert["rows"]), (5, 5))
+        select = stats["statements"]["SELECT * FROM invoices WHERE price > ?"]
+        self.assertEqual((select["count"], select["rows"]), (2, 4))
+        self.assertGreaterEqual(select["p99_ms"], select["p50_ms"])
+        self.assertGreater(stats["connection_wait"]["count"], 0)
+
+    def test_slow_query_log_and_export(self):
+        seen = []
+        self.db.instrumentation.slow_query_ms = 0
+        self.db.instrumentation.on_slow_query = seen.append
+        self.crud.read("invoices", {"vendor": "Acme"})
+
+        self.assertEqual(len(seen), 1)
+        self.assertTrue(any("invoices" in step for step in seen[0]["plan"]))
+
+        self.db.instrumentation.dump_json(TEST_DB + ".json")
+        with open(TEST_DB + ".json", encoding="utf-8") as file:
+            self.assertEqual(len(json.load(file)["slow_queries"]), 1)
+
+    def test_disabled(self):
+        self.db.instrumentation.disable()
+        self.crud.read("invoices")
+        self.assertEqual(self.crud.query_stats()["statements"], {})
+
+
+if __name__ == "__main__":
+    unittest.main()
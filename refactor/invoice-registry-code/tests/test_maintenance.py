@@ -0,0 +1,79 @@
+import unittest
+import os, sys
+import shutil
+import tempfile
+import time
+from db.Modulated_Database_Constructor import Modulation
+
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+class TestMaintenanceScheduler(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.db = Modulation.SQLiteDatabase(os.path.join(self.directory, "registry.db"))
+        self.db.execute_dict("CREATE TABLE logs (ID INTEGER PRIMARY KEY, event TEXT)")
+        self.db.execute_dict("CREATE INDEX idx_logs_event ON logs(event)")
+        self.db.transaction_dict([
+            ("INSERT INTO logs (event) VALUES (:event)", {"event": f"event {i}" * 20}) for i in range(500)
+        ])
+
+    def tearDown(self):
+        self.db.stop_maintenance()
+        shutil.rmtree(self.directory)
+
+    def scheduler(self, **settings):
+        defaults = {"wal_checkpoint_bytes": 1, "wal_truncate_bytes": 1 << 40, "optimize_after_writes": 1,
+                    "idle_seconds": 3600, "verbose": False}
+        defaults.update(settings)
+        return Modulation.MaintenanceScheduler(self.db, **defaults)
+
+    def test_checkpoint_and_optimize_thresholds(self):
+        scheduler = self.scheduler()
+        self.db.execute_dict("UPDATE logs SET event = 'burst' WHERE ID = 1")
+        self.assertGreater(scheduler.wal_size(), 0)
+        jobs = scheduler.run_pending()
+        self.assertEqual([job["job"] for job in jobs], ["checkpoint_passive", "optimize"])
+        self.assertEqual(jobs[1]["result"]["statement"], "ANALYZE")
+
+        # No new writes: nothing but the checkpoint is due, statistics now exist.
+        self.assertEqual([job["job"] for job in scheduler.run_pending()], ["checkpoint_passive"])
+        self.db.execute_dict("DELETE FROM logs WHERE ID < 10")
+        self.assertEqual(scheduler.optimize()["result"]["statement"], "PRAGMA optimize")
+
+        truncate = self.scheduler(wal_truncate_bytes=1).run_pending()[0]
+        self.assertEqual(truncate["job"], "checkpoint_truncate")
+        self.assertEqual(truncate["result"]["wal_bytes_after"], 0)
+
+    def test_optimize_keeps_cached_results(self):
+        cache = self.db.enable_query_cache()
+        count = "SELECT COUNT(*) AS n FROM logs"
+        self.assertEqual(self.db.fetch_one_dict(count)["n"], 500)
+        self.scheduler().optimize()
+        self.assertEqual(self.db.fetch_one_dict(count)["n"], 500)
+        self.assertEqual(cache.stats()["hits"], 1)
+
+    def test_incremental_vacuum_when_idle(self):
+        scheduler = self.scheduler(wal_checkpoint_bytes=1 << 40, optimize_after_writes=10 ** 9, idle_seconds=0)
+        self.assertIsNone(scheduler.incremental_vacuum())  # auto_vacuum is NONE by default
+        scheduler.enable_incremental_vacuum()
+        self.db.execute_dict("DELETE FROM logs")
+
+        jobs = scheduler.run_pending()
+        self.assertEqual([job["job"] for job in jobs], ["incremental_vacuum"])
+        self.assertGreater(jobs[0]["result"]["freed_pages"], 0)
+        self.assertEqual(scheduler.run_pending(), [])  # Already vacuumed for this idle period
+
+    def test_background_thread(self):
+        scheduler = self.db.start_maintenance(interval=0.01, wal_checkpoint_bytes=1, verbose=False)
+        deadline = time.time() + 5
+        while not scheduler.history and time.time() < deadline:
+            time.sleep(0.01)
+        self.db.stop_maintenance()
+        self.assertIsNone(self.db.maintenance)
+        self.assertTrue(scheduler.history)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,166 @@
+import unittest
+import os, sys
+import sqlite3
+from db.Modulated_Database_Constructor import Modulation
+from db.Inv_DB import TableMaker
+
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+TEST_DB = os.path.join(os.path.dirname(__file__), "test_migrations.db")
+
+
+class TestMigrator(unittest.TestCase):
+    def setUp(self):
+        self.db = Modulation.SQLiteDatabase(TEST_DB)
+        self.v1 = Modulation.Migration(1, "vendors", [
+            "CREATE TABLE vendors (ID INTEGER PRIMARY KEY, name TEXT)"
+        ])
+        self.v2 = Modulation.Migration(
+            2, "vendor keys",
+            ["ALTER TABLE vendors ADD COLUMN name_key TEXT"],
+            [Modulation.Backfill("vendors", "name_key = lower(name)", batch_size=7)]
+        )
+
+    def tearDown(self):
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(TEST_DB + suffix):
+                os.remove(TEST_DB + suffix)
+
+    def test_versions_and_chunked_backfill(self):
+        migrator = Modulation.Migrator(self.db, [self.v1])
+        self.assertEqual(migrator.migrate(), 1)
+        self.db.transaction_dict([
+            ("INSERT INTO vendors (name) VALUES (:name)", {"name": f"Vendor-{i}"}) for i in range(30)
+        ])
+
+        chunks = []
+        migrator = Modulation.Migrator(self.db, [self.v1, self.v2],
+                                       progress=lambda m, i, last, top, n: chunks.append(n))
+        self.assertEqual([m.version for m in migrator.pending()], [2])
+        self.assertEqual(migrator.migrate(), 2)
+        self.assertEqual(chunks, [7, 7, 7, 7, 2])
+        self.assertEqual(self.db.fetch_one_dict("SELECT name_key FROM vendors WHERE ID = 3")["name_key"],
+                         "vendor-2")
+        self.assertEqual(self.db.fetch_all_dict("SELECT * FROM _migration_progress"), [])
+        self.assertEqual(migrator.pending(), [])
+
+    def test_resume_after_interrupted_backfill(self):
+        Modulation.Migrator(self.db, [self.v1]).migrate()
+        self.db.transaction_dict([
+            ("INSERT INTO vendors (name) VALUES (:name)", {"name": f"V{i}"}) for i in range(20)
+        ])
+
+        def crash(migration, index, last_rowid, max_rowid, updated):
+            raise KeyboardInterrupt
+
+        with self.assertRaises(KeyboardInterrupt):
+            Modulation.Migrator(self.db, [self.v1, self.v2], progress=crash).migrate()
+        self.assertEqual(Modulation.Migrator(self.db, []).current_version(), 1)
+        self.assertEqual(
+            self.db.fetch_one_dict("SELECT COUNT(*) AS n FROM vendors WHERE name_key IS NOT NULL")["n"], 7
+        )
+
+        # The ALTER TABLE is not repeated, the backfill continues after rowid 7.
+        chunks = []
+        migrator = Modulation.Migrator(self.db, [self.v1, self.v2],
+                                       progress=lambda m, i, last, top, n: chunks.append(last))
+        self.assertEqual(migrator.migrate(), 2)
+        self.assertEqual(chunks, [14, 20])
+        self.assertEqual(
+            self.db.fetch_one_dict("SELECT COUNT(*) AS n FROM vendors WHERE name_key IS NULL")["n"], 0
+        )
+
+    def test_concurrent_migrator_finishing_first(self):
+        Modulation.Migrator(self.db, [self.v1]).migrate()
+        self.db.transaction_dict([
+            ("INSERT INTO vendors (name) VALUES (:name)", {"name": f"V{i}"}) for i in range(20)
+        ])
+        v2 = Modulation.Migration(2, "counter", ["ALTER TABLE vendors ADD COLUMN hits INTEGER DEFAULT 0"],
+                                  [Modulation.Backfill("vendors", "hits = hits + 1", batch_size=5)])
+        other = Modulation.Migrator(self.db, [self.v1, v2])
+
+        def finish_elsewhere(migration, index, last_rowid, max_rowid, updated):
+            if last_rowid == 5:
+                self.assertEqual(other.migrate(), 2)  # another process completes the migration
+
+        self.assertEqual(Modulation.Migrator(self.db, [self.v1, v2], progress=finish_elsewhere).migrate(), 2)
+        self.assertEqual(self.db.fetch_all_dict("SELECT DISTINCT hits FROM vendors"), [{"hits": 1}])
+
+        # A migrator that read the old version before the other one finished skips the DDL.
+        conn = self.db._get_connection()
+        conn.isolation_level = None
+        try:
+            self.assertFalse(other._apply_schema(conn, v2))
+        finally:
+            conn.close()
+
+    def _trace_statements(self, db):
+        statements = []
+        connect = db._get_connection
+
+        def traced():
+            conn = connect()
+            conn.set_trace_callback(statements.append)
+            return conn
+
+        db._get_connection = traced
+        return statements
+
+    def test_bootstrap_in_one_transaction(self):
+        statements = self._trace_statements(self.db)
+        v2 = Modulation.Migration(2, "vendor index", ["CREATE INDEX idx_vendor_name ON vendors(name)"])
+        self.assertEqual(Modulation.Migrator(self.db, [self.v1, v2]).migrate(), 2)
+        self.assertEqual(statements.count("COMMIT"), 1)
+
+        del statements[:]
+        self.assertEqual(Modulation.Migrator(self.db, [self.v1, v2]).migrate(), 2)
+        self.assertEqual(statements, ["PRAGMA user_version"])
+
+    def test_table_maker_schema_version(self):
+        table_maker = TableMaker(TEST_DB)
+        self.assertEqual(table_maker.migrate(), len(table_maker.migrations))
+        indexes = self.db.fetch_all_dict("SELECT name FROM sqlite_master WHERE type = 'index'")
+        self.assertIn("idx_notes_invoice_id", [row["name"] for row in indexes])
+
+    def test_pre_minor_unit_registry_is_converted(self):
+        conn = sqlite3.connect(TEST_DB)  # Registry written before money was stored in minor units
+        conn.executescript("""
+            CREATE TABLE invoices(ID INTEGER PRIMARY KEY AUTOINCREMENT, invoice_number TEXT,
+                                  vendor_name TEXT, date TEXT, due_date TEXT, price INTEGER);
+            CREATE TABLE outstanding_table(invoice_id INTEGER, invoice_number TEXT, initial_price INTEGER,
+                                           total_credits INTEGER DEFAULT 0, total_debits INTEGER DEFAULT 0,
+                                           due_date TEXT, payment INTEGER, outstanding INTEGER);
+            INSERT INTO invoices (invoice_number, price) VALUES ('OLD-1', 1000), ('OLD-2', 10.5),
+                                                                ('OLD-3', 1.005), ('OLD-4', 0.285);
+            INSERT INTO outstanding_table (invoice_id, initial_price, payment, outstanding)
+                VALUES (1, 1000, 250.25, 749.75);
+        """)
+        conn.close()
+
+        table_maker = TableMaker(TEST_DB)
+        self.assertEqual([row["price"] for row in table_maker.read("invoices")], [1000, 10.5, 1.01, 0.29])
+        self.assertEqual(self.db.fetch_one_dict("SELECT price FROM invoices WHERE ID = 2")["price"], 1050)
+        # Same rounding as amounts entered after the migration (SQLite's ROUND gives 100 and 28)
+        for invoice_id, amount in ((3, 1.005), (4, 0.285)):
+            minor = self.db.fetch_one_dict("SELECT price FROM invoices WHERE ID = ?", (invoice_id,))["price"]
+            self.assertEqual(minor, Modulation.Money.to_minor(amount))
+        balance = table_maker.read("outstanding_table")[0]
+        self.assertEqual((balance["payment"], balance["outstanding"]), (250.25, 749.75))
+        self.assertEqual(table_maker.change_feed.read(), [])  # conversion ran before the feed triggers
+
+        TableMaker(TEST_DB)  # Reopening does not convert again
+        self.assertEqual(table_maker.read("invoices")[0]["price"], 1000)
+
+    def test_table_maker_bootstrap_is_one_commit(self):
+        statements = self._trace_statements(self.db)
+        migrator = Modulation.Migrator(self.db, TableMaker(TEST_DB + ".tmp").migrations)
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(TEST_DB + ".tmp" + suffix):
+                os.remove(TEST_DB + ".tmp" + suffix)
+        self.assertEqual(migrator.migrate(), len(migrator.migrations))
+        self.assertEqual(statements.count("COMMIT"), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
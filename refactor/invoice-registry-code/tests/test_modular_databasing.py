@@ -31,16 +31,16 @@ class TestModulationCRUD(unittest.TestCase):
         data = {"vendor": "Acme", "amount": 1000.5, "status": "Pending"}
         new_id = self.crud.create("invoices", data)
         result = self.crud.read("invoices", {"id": new_id})
-        self.assertEqual(result["vendor"], data["vendor"])
-        self.assertEqual(result["amount"], data["amount"])
-        self.assertEqual(result["status"], data["status"])
+        self.assertEqual(result[0]["vendor"], data["vendor"])
+        self.assertEqual(result[0]["amount"], data["amount"])
+        self.assertEqual(result[0]["status"], data["status"])
 
     def test_update(self):
         row_id = self.crud.create("invoices", {"vendor": "Old", "amount": 300, "status": "Pending"})
         updated = self.crud.update("invoices", {"vendor": "New"}, {"id": row_id})
         self.assertEqual(updated, 1)
         updated_row = self.crud.read("invoices", {"id": row_id})
-        self.assertEqual(updated_row["vendor"], "New")
+        self.assertEqual(updated_row[0]["vendor"], "New")
 
     def test_delete(self):
         row_id = self.crud.create("invoices", {"vendor": "DeleteMe", "amount": 200, "status": "Paid"})
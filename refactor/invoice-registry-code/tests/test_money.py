@@ -0,0 +1,26 @@
+import unittest
+import os, sys
+from decimal import Decimal
+from db.Modulated_Database_Constructor import Modulation
+
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+class TestMoney(unittest.TestCase):
+    def test_float_and_string_round_alike(self):
+        for value in ("0.125", "1.005", "2.675", "-0.125", "19.99"):
+            self.assertEqual(Modulation.Money.to_minor(float(value)), Modulation.Money.to_minor(value), value)
+        self.assertEqual(Modulation.Money.to_minor(0.125), 13)
+        self.assertEqual(Modulation.Money.to_minor(1.005), 101)
+        self.assertEqual(Modulation.Money.to_minor(Decimal("1.005")), 101)
+
+    def test_scales(self):
+        self.assertEqual(Modulation.Money.to_minor(12, "JPY"), 12)
+        self.assertEqual(Modulation.Money.to_minor(1.2345, "KWD"), 1235)
+        self.assertEqual(Modulation.Money.from_minor(1050), 10.5)
+        self.assertIsNone(Modulation.Money.to_minor(None))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+import os, sys
+from db.Inv_DB import TableMaker
+
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+TEST_DB = os.path.join(os.path.dirname(__file__), "test_notes.db")
+
+
+class TestNoteDeltas(unittest.TestCase):
+    def setUp(self):
+        self.db = TableMaker(TEST_DB)
+        self.invoice_a = self.db.create("invoices", {"invoice_number": "A-1", "price": 1000})
+        self.invoice_b = self.db.create("invoices", {"invoice_number": "B-1", "price": 500})
+        for invoice_id, price in ((self.invoice_a, 1000), (self.invoice_b, 500)):
+            self.db.create("outstanding_table", {
+                "invoice_id": invoice_id, "initial_price": price, "total_credits": 0,
+                "total_debits": 0, "payment": 0, "outstanding": price
+            })
+
+    def tearDown(self):
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(TEST_DB + suffix):
+                os.remove(TEST_DB + suffix)
+
+    def balance(self, invoice_id):
+        row = self.db.read("outstanding_table", {"invoice_id": invoice_id})[0]
+        return {k: row[k] for k in ("total_credits", "total_debits", "outstanding")}
+
+    def test_create_update_delete(self):
+        note_id = self.db.create_note(
+            {"invoice_id": self.invoice_a, "note_number": "CN-1", "note_type": "Credit", "price": 100}
+        )
+        self.assertEqual(self.balance(self.invoice_a),
+                         {"total_credits": 100, "total_debits": 0, "outstanding": 900})
+
+        # Turning the credit into a debit and raising its price.
+        self.assertEqual(self.db.update_note(note_id, {"note_type": "Debit", "price": 150}), 1)
+        self.assertEqual(self.balance(self.invoice_a),
+                         {"total_credits": 0, "total_debits": 150, "outstanding": 1150})
+
+        # Moving the note to another invoice only touches both balances.
+        self.db.update_note(note_id, {"invoice_id": self.invoice_b})
+        self.assertEqual(self.balance(self.invoice_a)["outstanding"], 1000)
+        self.assertEqual(self.balance(self.invoice_b),
+                         {"total_credits": 0, "total_debits": 150, "outstanding": 650})
+
+        self.assertEqual(self.db.delete_note(note_id), 1)
+        self.assertEqual(self.balance(self.invoice_b)["outstanding"], 500)
+
+    def test_bulk_update_merges_repeated_edits(self):
+        ids = [
+            self.db.create_note({"invoice_id": self.invoice_a, "note_type": "Credit", "price": 10})
+            for _ in range(50)
+        ]
+        edits = [(note_id, {"price": 20}) for note_id in ids]
+        edits += [(ids[0], {"note_type": "Debit"}), (ids[0], {"invoice_id": self.invoice_b}), (9999, {"price": 1})]
+        self.assertEqual(self.db.bulk_update_notes(edits), 50)
+
+        self.assertEqual(self.balance(self.invoice_a),
+                         {"total_credits": 49 * 20, "total_debits": 0, "outstanding": 1000 - 49 * 20})
+        self.assertEqual(self.balance(self.invoice_b),
+                         {"total_credits": 0, "total_debits": 20, "outstanding": 520})
+
+    def test_money_stored_as_minor_units(self):
+        note_id = self.db.create_note({"invoice_id": self.invoice_a, "note_type": "Credit", "price": 10.25})
+        raw = self.db.fetch_one_dict("SELECT price FROM credits_debits_notes WHERE ID = :id", {"id": note_id})
+        self.assertEqual(raw["price"], 1025)
+        self.assertEqual(self.db.read("credits_debits_notes", {"ID": note_id})[0]["price"], 10.25)
+        self.assertEqual(self.balance(self.invoice_a)["outstanding"], 989.75)
+
+        self.assertEqual(self.db.sum_money("outstanding_table", "outstanding"), 1489.75)
+        self.assertEqual(self.db.sum_money("outstanding_table", "outstanding", as_minor=True), 148975)
+        self.assertEqual(list(self.db.money_array("invoices", "price")), [100000, 50000])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+import os, sys
+from db.Inv_DB import TableMaker
+
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+TEST_DB = os.path.join(os.path.dirname(__file__), "test_query_cache.db")
+
+
+class TestQueryCache(unittest.TestCase):
+    def setUp(self):
+        self.db = TableMaker(TEST_DB)
+        self.cache = self.db.enable_query_cache(max_entries=3)
+        self.invoice_id = self.db.create("invoices", {"invoice_number": "A-1", "vendor_name": "Acme",
+                                                      "due_date": "2025-01-31", "price": 100})
+        self.db.create("outstanding_table", {"invoice_id": self.invoice_id, "due_date": "2025-01-31",
+                                             "payment": 0, "outstanding": 100})
+
+    def tearDown(self):
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(TEST_DB + suffix):
+                os.remove(TEST_DB + suffix)
+
+    def test_hits_and_table_invalidation(self):
+        self.assertEqual(len(self.db.read("invoices")), 1)
+        rows = self.db.read("invoices")
+        rows[0]["vendor_name"] = "mutated by caller"
+        self.assertEqual(self.db.read("invoices")[0]["vendor_name"], "Acme")
+        self.assertEqual(self.cache.stats()["hits"], 2)
+
+        self.db.read("logs")
+        self.db.create("invoices", {"invoice_number": "A-2", "price": 5})
+        self.assertEqual(len(self.db.read("invoices")), 2)
+        self.db.read("logs")
+        self.assertEqual(self.cache.stats()["hits"], 3)  # logs survived the invoices write
+
+    def test_views_and_direct_writers_invalidate(self):
+        summary = "SELECT total_outstanding FROM daily_summary"
+        self.assertEqual(self.db.fetch_one_dict(summary)["total_outstanding"], 10000)
+        self.db.create_note({"invoice_id": self.invoice_id, "note_type": "Credit", "price": 40})
+        self.assertEqual(self.db.fetch_one_dict(summary)["total_outstanding"], 6000)
+
+    def test_comma_join_reads_every_table(self):
+        sql = ("SELECT o.outstanding FROM invoices i, outstanding_table o "
+               "WHERE o.invoice_id = i.ID AND i.ID = :id")
+        self.assertEqual(self.db.fetch_one_dict(sql, {"id": self.invoice_id})["outstanding"], 10000)  # raw SQL, minor units
+        self.db.update("outstanding_table", {"outstanding": 25}, {"invoice_id": self.invoice_id})
+        self.assertEqual(self.db.fetch_one_dict(sql, {"id": self.invoice_id})["outstanding"], 2500)
+
+    def test_cte_write_invalidates(self):
+        count = "SELECT COUNT(*) AS n FROM invoices"
+        self.assertEqual(self.db.fetch_one_dict(count)["n"], 1)
+        self.db.execute_dict("WITH v AS (SELECT 'A-2' AS number) "
+                             "INSERT INTO invoices (invoice_number) SELECT number FROM v")
+        self.assertEqual(self.db.fetch_one_dict(count)["n"], 2)
+
+    def test_trigger_targets_invalidate(self):
+        feed = "SELECT COUNT(*) AS n FROM change_feed WHERE table_name = 'credits_debits_notes'"
+        self.assertEqual(self.db.fetch_one_dict(feed)["n"], 0)
+        self.db.create_note({"invoice_id": self.invoice_id, "note_type": "Debit", "price": 1})
+        self.assertEqual(self.db.fetch_one_dict(feed)["n"], 1)
+
+    def test_nondeterministic_functions_are_not_cached(self):
+        random_row = "SELECT random() AS r FROM invoices"
+        self.assertNotEqual(self.db.fetch_one_dict(random_row)["r"], self.db.fetch_one_dict(random_row)["r"])
+        for sql, parameters in (("SELECT COUNT(*) AS n FROM invoices WHERE due_date < date('now')", None),
+                                ("SELECT COUNT(*) AS n FROM invoices WHERE julianday(due_date) < julianday()", None),
+                                ("SELECT COUNT(*) AS n FROM invoices WHERE due_date < date(:when)", {"when": "now"}),
+                                ("SELECT last_insert_rowid() AS id FROM roles", None)):
+            self.db.fetch_one_dict(sql, parameters)
+            self.db.fetch_one_dict(sql, parameters)
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["entries"], stats["uncacheable"]), (0, 0, 10))
+
+        fixed = "SELECT date(due_date, '+1 day') AS d FROM invoices"
+        self.assertEqual(self.db.fetch_one_dict(fixed)["d"], self.db.fetch_one_dict(fixed)["d"])
+        self.assertEqual(self.cache.stats()["hits"], 1)
+
+    def test_statements_without_tables_are_not_cached(self):
+        self.db.fetch_one_dict("SELECT 1 AS one")
+        self.assertEqual(self.db.fetch_one_dict("SELECT 1 AS one")["one"], 1)
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["entries"], stats["uncacheable"]), (0, 0, 2))
+
+    def test_lru_eviction(self):
+        for table in ("invoices", "logs", "roles", "credits_debits_notes"):
+            self.db.read(table)
+        stats = self.cache.stats()
+        self.assertEqual((stats["entries"], stats["evictions"]), (3, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+import os, sys
+import shutil
+import tempfile
+from datetime import date
+from db.Inv_DB import TableMaker
+from db.Report_Runner import ReportRunner, due_reports
+
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+class TestReportRunner(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.directory, "registry.db")
+        db = TableMaker(self.db_path)
+        for i, vendor in enumerate(["Delta", "Alpha", "Charlie", "Bravo", "Echo"] * 2):
+            invoice_id = db.create("invoices", {"invoice_number": f"INV-{i}", "vendor_name": vendor,
+                                                "date": "2025-01-01", "due_date": f"2025-01-{10 + i:02d}",
+                                                "price": 100 + i})
+            db.create("outstanding_table", {"invoice_id": invoice_id, "due_date": f"2025-01-{10 + i:02d}",
+                                            "payment": 0, "outstanding": 100 + i})
+        db.create_note({"invoice_id": 1, "note_number": "CN-1", "note_type": "Credit", "price": 25.5})
+        self.runner = ReportRunner(self.db_path, processes=2)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_vendor_statements_stream_in_order(self):
+        path = os.path.join(self.directory, "statements.txt")
+        progress = []
+        stats = self.runner.vendor_statements_to_file(path, vendors_per_partition=2,
+                                                      progress=lambda done, total: progress.append((done, total)))
+        self.assertEqual(stats, {"partitions": 3, "items": 5})
+        self.assertEqual(progress[-1], (3, 3))
+
+        with open(path, encoding="utf-8") as file:
+            text = file.read()
+        headers = [line for line in text.splitlines() if line.startswith("STATEMENT OF ACCOUNT")]
+        self.assertEqual([header.rsplit(" ", 1)[-1] for header in headers],
+                         ["Alpha", "Bravo", "Charlie", "Delta", "Echo"])
+        self.assertIn("Credit CN-1 on INV-0: 25.50", text)
+        self.assertIn("179.50", text)  # Delta: 100 - 25.50 + 105
+
+    def test_due_reports_by_date_range(self):
+        lines = []
+        partitions = self.runner.date_partitions(date(2025, 1, 1), date(2025, 1, 31), days=3)
+        self.runner.run(due_reports, partitions, lines.append)
+        self.assertEqual(len(lines), 10)
+        self.assertEqual(lines, sorted(lines))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,111 @@
+import unittest
+import os, sys
+
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'GUI-Base')))
+
+from _RIBBON_COMPILER_VER1 import RibbonCompiler, RibbonConfigError, LAYOUT, WIDGET  # noqa: E402
+
+
+def on_click():
+    pass
+
+
+def bound(plan, config):
+    """Creator kwargs of the table step once config is bound to plan."""
+    return {step.path: args for step, args in plan.bind(config)}[("data_table",)]
+
+
+class TestRibbonCompiler(unittest.TestCase):
+    def setUp(self):
+        self.compiler = RibbonCompiler(cache_size=2)
+        self.config = {
+            "qhboxlayout_main": {
+                "title_label": {"widget_type": "label", "text": "Main"},
+                "qvboxlayout_side": {
+                    "save_button": {"widget_type": "button", "text": "Save", "callback": on_click,
+                                    "tags": ["write"]},
+                },
+                "search_box": {"widget_type": "input_box"},
+            },
+            "data_table": {"widget_type": "table", "rows": 1, "columns": 2, "data": [[1, 2]],
+                           "header": ["A", "B"]},
+        }
+
+    def test_plan_order_and_args(self):
+        plan = self.compiler.compile(self.config)
+        self.assertEqual(plan.paths, (
+            ("qhboxlayout_main",),
+            ("qhboxlayout_main", "title_label"),
+            ("qhboxlayout_main", "qvboxlayout_side"),
+            ("qhboxlayout_main", "qvboxlayout_side", "save_button"),
+            ("qhboxlayout_main", "search_box"),
+            ("data_table",),
+        ))
+        steps = {step.path: step for step in plan}
+        for step in plan:
+            self.assertTrue(step.parent == () or steps[step.parent].kind == LAYOUT)
+            self.assertLess(plan.paths.index(step.parent) if step.parent else -1, plan.paths.index(step.path))
+
+        side = steps[("qhboxlayout_main", "qvboxlayout_side")]
+        self.assertEqual((side.kind, side.widget_type), (LAYOUT, "qvboxlayout"))
+        save = steps[("qhboxlayout_main", "qvboxlayout_side", "save_button")]
+        self.assertEqual((save.kind, save.args, save.tags), (WIDGET, {"text": "Save", "on_click": on_click}, ("write",)))
+        self.assertEqual(steps[("qhboxlayout_main", "search_box")].args, {"placeholder": "Enter text"})
+        self.assertEqual(steps[("data_table",)].args["headers"], ["A", "B"])
+
+    def test_validation_errors_are_collected(self):
+        config = {
+            "scrollh_old": {"label": {"widget_type": "label"}},
+            "qhboxlayout_main": {
+                "start_button": {"widget_type": "button", "callback": "start_function"},
+                "slider": {"widget_type": "slider"},
+                "title_label": {"widget_type": "label", "colour": "red"},
+                "data_table": {"widget_type": "table", "rows": True},
+                "tagged": {"widget_type": "label", "tags": ["write", 1]},
+            },
+        }
+        with self.assertRaises(RibbonConfigError) as raised:
+            self.compiler.compile(config)
+        errors = raised.exception.errors
+        self.assertEqual(len(errors), 6)
+        self.assertIn("scrollh_old: unknown layout", errors[0])
+        self.assertIn("'callback' has invalid value 'start_function'", errors[1])
+        self.assertIn("unknown widget_type 'slider'", errors[2])
+        self.assertIn("unknown key 'colour'", errors[3])
+        self.assertIn("'rows' has invalid value True", errors[4])
+        self.assertIn("'tags' must only contain strings", errors[5])
+        self.assertIsInstance(raised.exception, ValueError)
+
+    def test_cache_hits_and_eviction(self):
+        plan = self.compiler.compile(self.config)
+        self.assertIs(self.compiler.compile(dict(self.config)), plan)
+
+        other = {"title_label": {"widget_type": "label", "text": "Other"}}
+        self.compiler.compile(other)
+        self.compiler.compile({"title_label": {"widget_type": "label", "text": "Third"}})
+        self.assertIsNot(self.compiler.compile(self.config), plan)  # evicted by the two newer configs
+
+        unhashable = {"title_label": {"widget_type": "label", "text": "Set", "style": {"color": {"red"}}}}
+        self.assertIsNot(self.compiler.compile(unhashable), self.compiler.compile(unhashable))
+
+    def test_payloads_are_bound_not_cached(self):
+        plan = self.compiler.compile(self.config)
+        table = [step for step in plan if step.path == ("data_table",)][0]
+        self.assertNotIn("data", table.args)
+        self.assertEqual(table.payload, (("data", "data"),))
+        self.assertEqual(bound(plan, self.config)["data"], [[1, 2]])
+
+        rebuilt = dict(self.config, data_table=dict(self.config["data_table"], data=[[3, 4], [5, 6]]))
+        self.assertIs(self.compiler.compile(rebuilt), plan)  # new rows, same structure
+        self.assertEqual(bound(plan, rebuilt)["data"], [[3, 4], [5, 6]])
+        self.assertEqual(bound(plan, dict(rebuilt, data_table={"widget_type": "table"}))["data"],
+                         None)
+
+        invalid = dict(self.config, data_table=dict(self.config["data_table"], data="rows"))
+        self.assertIs(self.compiler.compile(invalid), plan)
+        with self.assertRaises(RibbonConfigError):
+            list(plan.bind(invalid))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+import os, sys
+from array import array
+from db.Inv_DB import TableMaker
+
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+TEST_DB = os.path.join(os.path.dirname(__file__), "test_row_modes.db")
+
+
+class TestRowModes(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.db = TableMaker(TEST_DB)
+        for i in range(5):
+            cls.db.create("invoices", {"invoice_number": f"INV-{i}", "vendor_name": "Acme" if i % 2 else None,
+                                       "price": 10 + i})
+        cls.db.execute_dict("UPDATE invoices SET due_date = 1.5 WHERE ID = 5")
+
+    @classmethod
+    def tearDownClass(cls):
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(TEST_DB + suffix):
+                os.remove(TEST_DB + suffix)
+
+    def test_tuple_and_record_modes(self):
+        rows = self.db.read("invoices", row_mode="tuple")
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows.get(0, "invoice_number"), "INV-0")
+        self.assertEqual(rows.column("price"), [10, 11, 12, 13, 14])  # major units, like the dict mode
+        self.assertEqual(rows.as_dicts(), self.db.read("invoices"))
+        self.assertEqual(self.db.read("invoices", {"ID": 2}, row_mode="record")[0].price, 11)
+        columnar = self.db.read("invoices", row_mode="columnar")
+        self.assertEqual(columnar.column("price"), array("d", [10, 11, 12, 13, 14]))
+        self.assertEqual(rows.as_dicts()[1]["vendor_name"], "Acme")
+
+        records = self.db.fetch_all("SELECT ID, price, COUNT(*) FROM invoices GROUP BY ID", row_mode="record")
+        self.assertEqual((records[2].ID, records[2].price), (3, 1200))
+        self.assertIs(type(records[0]), type(self.db.fetch_all("SELECT ID, price, COUNT(*) FROM invoices",
+                                                                row_mode="record")[0]))
+
+    def test_columnar_mode(self):
+        batch = self.db.fetch_all("SELECT ID, price, vendor_name, due_date FROM invoices ORDER BY ID",
+                                  row_mode="columnar", batch_size=2)
+        self.assertEqual(len(batch), 5)
+        self.assertEqual(batch.column("price"), array("q", [1000, 1100, 1200, 1300, 1400]))
+        self.assertEqual(batch.column("vendor_name"), [None, "Acme", None, "Acme", None])
+        self.assertIsInstance(batch.column("due_date"), list)
+        self.assertEqual(batch.row(4), (5, 1400, None, "1.5"))  # due_date has TEXT affinity
+        self.assertEqual(len(list(batch)), 5)
+
+        floats = self.db.fetch_all("SELECT price * 1.0 AS p FROM invoices UNION ALL SELECT 7", row_mode="columnar")
+        self.assertEqual(floats.column("p").typecode, "d")
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            self.db.fetch_all("SELECT 1", row_mode="arrow")
+
+
+if __name__ == "__main__":
+    unittest.main()
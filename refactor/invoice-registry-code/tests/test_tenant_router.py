@@ -0,0 +1,52 @@
+import unittest
+import os, sys
+import shutil
+import tempfile
+from db.Tenant_Router import TenantRouter
+
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+
+class TestTenantRouter(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.router = TenantRouter(self.directory, max_open=2)
+
+    def tearDown(self):
+        self.router.close()
+        shutil.rmtree(self.directory)
+
+    def test_lazy_open_and_lru(self):
+        first = self.router.get("karachi")
+        self.assertIs(self.router.get("karachi"), first)
+        self.router.get("lahore")
+        self.router.get("karachi")
+        self.router.get("islamabad")
+        self.assertEqual(self.router.open_tenants(), ["karachi", "islamabad"])
+        self.assertEqual(self.router.tenants(), ["islamabad", "karachi", "lahore"])
+
+        self.router.idle_seconds = 0
+        self.assertEqual(sorted(self.router.close_idle()), ["islamabad", "karachi"])
+
+    def test_rejects_path_escapes(self):
+        for key in ("../other", "a/b", "", ".hidden"):
+            with self.assertRaises(ValueError):
+                self.router.get(key)
+
+    def test_cross_tenant_reports(self):
+        for tenant, balances in (("north", [100, 250.5]), ("south", [40]), ("east", [])):
+            handle = self.router.get(tenant)
+            for outstanding in balances:
+                handle.create("outstanding_table", {"invoice_id": 1, "outstanding": outstanding})
+
+        report = self.router.total_outstanding()
+        self.assertEqual(report["total"], 390.5)
+        self.assertEqual(report["per_tenant"], {"east": 0, "north": 350.5, "south": 40})
+
+        rows = self.router.query_all("SELECT COUNT(*) AS n FROM outstanding_table")
+        self.assertEqual({row["tenant"]: row["n"] for row in rows}, {"east": 0, "north": 2, "south": 1})
+
+
+if __name__ == "__main__":
+    unittest.main()
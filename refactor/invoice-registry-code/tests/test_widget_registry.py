@@ -0,0 +1,87 @@
+import unittest
+import os, sys
+
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'GUI-Base')))
+
+from _WIDGET_REGISTRY_VER1 import WidgetRegistry  # noqa: E402
+
+
+class Signal:
+    """Stand-in for a Qt signal: connect() stores the slots, emit() calls them."""
+
+    def __init__(self):
+        self.slots = []
+
+    def connect(self, slot):
+        self.slots.append(slot)
+
+    def emit(self, *args):
+        for slot in list(self.slots):
+            slot(*args)
+
+
+class QPushButton:
+    def __init__(self):
+        self.destroyed = Signal()
+        self.enabled = True
+
+    def setEnabled(self, enabled):
+        self.enabled = enabled
+
+
+class QLabel(QPushButton):
+    pass
+
+
+class TestWidgetRegistry(unittest.TestCase):
+    def setUp(self):
+        self.registry = WidgetRegistry()
+        self.save, self.delete, self.title = QPushButton(), QPushButton(), QLabel()
+        self.registry.register(("root", "save_button"), self.save, ["write"])
+        self.registry.register("root.delete_button", self.delete, ("write", "danger"))
+        self.registry.register(["root", "title_label"], self.title)
+
+    def test_paths(self):
+        self.assertIs(self.registry.get("root.save_button"), self.save)
+        self.assertIs(self.registry.get(["root", "delete_button"]), self.delete)
+        self.assertIn(("root", "title_label"), self.registry)
+        self.assertEqual(self.registry.path_of(self.title), ("root", "title_label"))
+        self.assertIsNone(self.registry.path_of(QLabel()))
+        self.assertEqual(len(self.registry), 3)
+
+    def test_type_and_tag_indexes(self):
+        self.assertEqual(self.registry.by_type("QPushButton"), [self.save, self.delete])
+        self.assertEqual(self.registry.by_type(QLabel), [self.title])  # exact type, no subclass matches
+        self.assertEqual(self.registry.by_tag("write"), [self.save, self.delete])
+        self.assertEqual(self.registry.tags_of("root.delete_button"), ("write", "danger"))
+
+        self.assertEqual(self.registry.set_enabled("write", False), 2)
+        self.assertEqual((self.save.enabled, self.delete.enabled, self.title.enabled), (False, False, True))
+
+        self.registry.unregister("root.delete_button")
+        self.assertEqual(self.registry.by_tag("danger"), [])
+        self.assertNotIn("danger", self.registry._by_tag)
+
+    def test_destroyed_removes_entry(self):
+        self.save.destroyed.emit(self.save)
+        self.assertNotIn("root.save_button", self.registry)
+        self.assertEqual(self.registry.by_tag("write"), [self.delete])
+        self.assertEqual(self.registry.by_type("QPushButton"), [self.delete])
+        self.assertIsNone(self.registry.path_of(self.save))
+
+    def test_late_destroyed_keeps_replacement(self):
+        replacement = QPushButton()
+        self.registry.register(("root", "save_button"), replacement, ["write"])
+        self.save.destroyed.emit(self.save)  # The replaced widget is deleted after its successor exists.
+        self.assertIs(self.registry.get("root.save_button"), replacement)
+        self.assertEqual(self.registry.by_tag("write"), [self.delete, replacement])
+
+    def test_clear_keeps_listed_paths(self):
+        self.registry.clear(keep=["root.title_label"])
+        self.assertEqual(list(self.registry), [(("root", "title_label"), self.title)])
+        self.assertEqual(self.registry.by_tag("write"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()